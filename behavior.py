@@ -1,72 +1,111 @@
 # directory behavior.py/
 
 import random
+from enum import IntEnum
 
-class Status:
-    SUCCESS = 'SUCCESS'
-    FAILURE = 'FAILURE'
-    WARNING = 'WARNING'
+class Status(IntEnum):
+    # Int-valued so tick results compare as plain ints
+    SUCCESS = 0
+    FAILURE = 1
+    WARNING = 2
 
 
 # --- Behavior tree base classes (kept unchanged)
 class Node:
+    __slots__ = ()
+
     def tick(self):
         raise NotImplementedError
 
 
 class Sequence(Node):
+    __slots__ = ("children",)
+
     def __init__(self, children):
         self.children = children
 
     def tick(self):
+        SUCCESS = Status.SUCCESS
         for child in self.children:
             status = child.tick()
-            if status != Status.SUCCESS:
+            if status != SUCCESS:
                 return status
-        return Status.SUCCESS
+        return SUCCESS
 
 
 class Selector(Node):
+    __slots__ = ("children",)
+
     def __init__(self, children):
         self.children = children
 
     def tick(self):
+        FAILURE = Status.FAILURE
         for child in self.children:
             status = child.tick()
-            if status != Status.FAILURE:
+            if status != FAILURE:
                 return status
-        return Status.FAILURE
+        return FAILURE
 
 
 # --- NPC behavior (uses global random; keep separate from world RNG)
+# Debug nodes only print when constructed with verbose=True.
 class IsEnemyVisible(Node):
+    __slots__ = ("verbose",)
+
+    def __init__(self, verbose=False):
+        self.verbose = verbose
+
     def tick(self):
         visible = random.choice([True, False])
-        print(f"Is enemy visible? {visible}")
+        if self.verbose:
+            print(f"Is enemy visible? {visible}")
         return Status.SUCCESS if visible else Status.FAILURE
 
 
 class AttackEnemy(Node):
+    __slots__ = ("verbose",)
+
+    def __init__(self, verbose=False):
+        self.verbose = verbose
+
     def tick(self):
-        print("Attacking enemy!")
+        if self.verbose:
+            print("Attacking enemy!")
         return Status.SUCCESS
 
 
 class Patrol(Node):
+    __slots__ = ("verbose",)
+
+    def __init__(self, verbose=False):
+        self.verbose = verbose
+
     def tick(self):
-        print("Patrolling area...")
+        if self.verbose:
+            print("Patrolling area...")
         return Status.SUCCESS
 
 
-def DebugNPCBehavior():
+# The leaf nodes carry no per-tick state, so the quiet tree is built once.
+IS_VISIBLE = IsEnemyVisible()
+ATTACK = AttackEnemy()
+PATROL = Patrol()
+DEBUG_NPC_TREE = Selector([Sequence([IS_VISIBLE, ATTACK]), PATROL])
+
+
+def DebugNPCBehavior(verbose=False):
     # If enemy visible -> attack
     # Otherwise -> patrol
-    root = Selector([
-        Sequence([IsEnemyVisible(), AttackEnemy()]),
-        Sequence([IsEnemyVisible(), AttackEnemy()]),
-        Patrol()
-    ])
+    if verbose:
+        root = Selector([
+            Sequence([IsEnemyVisible(True), AttackEnemy(True)]),
+            Patrol(True)
+        ])
+    else:
+        root = DEBUG_NPC_TREE
 
     for i in range(5):
-        print(f"\nTick {i + 1}")
-        root.tick()
\ No newline at end of file
+        if verbose:
+            print(f"\nTick {i + 1}")
+        root.tick()
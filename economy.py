@@ -1,10 +1,16 @@
 # directory economy.py/
+import random
 from random import Random
 from tile_state import TileState
-from resource_catalog import GetResourcesForTerrain, GetResourcesForTile, GetResourceType
+from resource_catalog import GetResourcesForTerrain, GetResourcesForTile, GetResourceType, RESOURCE_TYPE_BY_NAME
 from world_utils import GetActiveTiles, LogEntityEvent
 from entities.settlement_factory import CreateSettlementAI
 import math
+from itertools import islice
+from collections import deque
+
+# Per-settlement, per-tick economy trace; very noisy, off by default
+LOG_ECONOMY_TICKS = False
 
 REGION_TRAIT_BONUSES = {
     "mining": ["iron", "stone", "crystallized water"],
@@ -20,25 +26,60 @@ REGION_TRAIT_BONUSES = {
 REGION_MULTIPLIER_INIT = 1.25 # Initial boost at world creation
 REGION_MULTIPLIER_TICK = 1.06 # Persistent tick boost
 
+TYPE_TO_RESOURCE_TYPES = {k: frozenset(v) for k, v in {
+    "agrarian": ["food"],
+    "logging": ["material"],
+    "mining": ["material", "trade"],
+    "luxury_goods": ["luxury", "trade"],
+    "trade_focused": ["all"],
+    "river_trade": ["food", "trade"],
+    "maritime_trade": ["food", "trade"],
+    "militaristic": ["material"],
+    "defensive": [],
+    "industrial": ["material"],
+    "monopolistic": ["all"],
+}.items()}
+TYPE_ALL_BOOST = {
+    "trade_focused": 1.03,  # gentler
+    "monopolistic": 1.12,   # strong early, weaker later
+}
+TYPE_CATEGORY_BOOST = 1.06  # +6% gentle boost per matching type
+
+# One bit per known settlement type; econ["type_mask"] mirrors econ["settlement_type"]
+SETTLEMENT_TYPE_BITS = {stype: 1 << i for i, stype in enumerate(TYPE_TO_RESOURCE_TYPES)}
+_TYPE_BOOST_CACHE = {}  # type_mask -> (all_mult, {category: mult})
+
 # --- Economy helpers
+def _get_world_index():
+    """Return the global WorldIndex if it has been built, else None."""
+    import world_index_store
+    return getattr(world_index_store, "world_index", None)
+
 def GetSettlementCoordsByID(world, settlement_id):
     """
     Return (x, y) coordinates of a Settlement with a given ID.
     If not found, returns None.
     """
-    for y, row in enumerate(world):
-        for x, tile in enumerate(row):
-            econ = tile.get_system("economy")
-            if econ and econ.get("id") == settlement_id:
-                return (x, y)
-    return None
+    found = GetSettlementByID(world, settlement_id)
+    if found is None:
+        return None
+    tile, _ = found
+    return (tile.x, tile.y)
 
 def GetSettlementByID(world, settlement_id):
     """
     Return (tile, economy) tuple for the specified Settlement ID.
     If not found, returns None.
+    Uses the WorldIndex settlement lookup when available (O(1)).
     """
-
+    widx = _get_world_index()
+    if widx:
+        tile = widx.settlement_by_id(settlement_id)
+        if tile is None:
+            return None
+        return (tile, tile.get_system("economy"))
+
+    # Fallback: scan economy tiles (index not built yet)
     for tile in GetActiveTiles(world, "economy"):
         econ = tile.get_system("economy")
         if econ and econ.get("id") == settlement_id:
@@ -50,6 +91,10 @@ def GetAllSettlementIDs(world):
     """
     Return a list of all Settlement IDs present in the world.
     """
+    widx = _get_world_index()
+    if widx:
+        return widx.settlement_ids()
+
     settlement_ids = []
     for tile in GetActiveTiles(world, "economy"):
         econ = tile.get_system("economy")
@@ -74,6 +119,18 @@ def get_region_resource_tags(tile):
         elif r_type == "diverse": tags.add("civilization")
     return tags
 
+def GetRegionBoostMultipliers(tile):
+    """
+    Per-resource persistent tick multiplier from the tile's regional traits.
+    Regions never change after worldgen, so this is computed once per
+    settlement and cached on the economy as "region_boost".
+    """
+    boost = {}
+    for trait in get_region_resource_tags(tile):
+        for r_name in REGION_TRAIT_BONUSES.get(trait, []):
+            boost[r_name] = boost.get(r_name, 1.0) * REGION_MULTIPLIER_TICK
+    return boost
+
 def get_settlement_category(tile):
     """Return the category string or None."""
     econ = tile.get_system("economy")
@@ -103,18 +160,39 @@ def is_settlement_category(tile, category: str) -> bool:
 # Settlement Types Helpers
 # -----------------------------
 
+def get_settlement_type_mask(types) -> int:
+    """Fold a list of settlement type names into a SETTLEMENT_TYPE_BITS mask."""
+    mask = 0
+    for t in types:
+        mask |= SETTLEMENT_TYPE_BITS.get(t, 0)
+    return mask
+
+
+def _get_type_mask(econ) -> int:
+    """Return the cached type mask on an economy, building it if missing."""
+    mask = econ.get("type_mask")
+    if mask is None:
+        mask = econ["type_mask"] = get_settlement_type_mask(econ.get("settlement_type", []))
+    return mask
+
+
 def get_settlement_types(tile) -> list:
     """Return list of types for this settlement."""
     econ = tile.get_system("economy")
     if econ is None:
         return []
-    return econ.get("settlement_types", [])
+    return econ.get("settlement_type", [])
 
 
 def has_settlement_type(tile, type_name: str) -> bool:
     """Check if settlement has a type."""
-    types = get_settlement_types(tile)
-    return type_name in types
+    econ = tile.get_system("economy")
+    if econ is None:
+        return False
+    bit = SETTLEMENT_TYPE_BITS.get(type_name)
+    if bit is None:
+        return type_name in econ.get("settlement_type", [])
+    return bool(_get_type_mask(econ) & bit)
 
 
 def add_settlement_type(tile, type_name: str):
@@ -122,9 +200,10 @@ def add_settlement_type(tile, type_name: str):
     econ = tile.get_system("economy")
     if econ is None:
         return
-    types = econ.setdefault("settlement_types", [])
+    types = econ.setdefault("settlement_type", [])
     if type_name not in types:
         types.append(type_name)
+        econ["type_mask"] = _get_type_mask(econ) | SETTLEMENT_TYPE_BITS.get(type_name, 0)
 
 
 def remove_settlement_type(tile, type_name: str):
@@ -132,9 +211,10 @@ def remove_settlement_type(tile, type_name: str):
     econ = tile.get_system("economy")
     if econ is None:
         return
-    types = econ.setdefault("settlement_types", [])
+    types = econ.setdefault("settlement_type", [])
     if type_name in types:
         types.remove(type_name)
+        econ["type_mask"] = _get_type_mask(econ) & ~SETTLEMENT_TYPE_BITS.get(type_name, 0)
 
 def modify_settlement(tile, category=None, add_type=None, remove_type=None):
     """Convenient batch updater for settlements."""
@@ -159,101 +239,116 @@ def tanh_eq(x, scale=1.0):
 def diminishing(x, power=0.5):
     return x ** power
 
-def assign_settlement_category(tile):
+# Weather -> production modifier, and its logistic-smoothed production factor.
+# The weather states are a closed set, so the per-tick logistic() is a lookup.
+WEATHER_ECON_MOD = {"rain": 1.1, "storm": 0.9, "drought": 0.6}
+WEATHER_PROD_FACTOR = {
+    state: logistic(mod, midpoint=1.0, k=4.0) for state, mod in WEATHER_ECON_MOD.items()
+}
+DEFAULT_PROD_FACTOR = logistic(1.0, midpoint=1.0, k=4.0)
+
+# --- Settlement classification tables -------------------------------
+# Evaluated top to bottom; the first matching rule wins.
+CATEGORY_TAG_RULES = (
+    ("trade_hub", "trade_post"),
+    ("military_path", "fort"),
+)
+COLD_CLIMATES = frozenset({"polar", "subpolar"})
+COLD_BIOMES = frozenset({"tundra", "cold_steppe"})
+# (default, upgraded, upgrade source ("tags"/"resources"), upgrade keys)
+COLD_CATEGORY_RULE = ("outpost", "camp", "tags", frozenset({"supplies_deficit", "hungry"}))
+BIOME_CATEGORY_RULES = {
+    "forest": ("forest_village", None, None, frozenset()),
+    "rainforest": ("forest_village", None, None, frozenset()),
+    "mountain": ("mountain_hamlet", "mining_camp", "resources", frozenset({"iron", "metal_ore"})),
+    "alpine": ("mountain_hamlet", "mining_camp", "resources", frozenset({"iron", "metal_ore"})),
+    "desert": ("desert_settlement", "oasis_town", "tags", frozenset({"oasis"})),
+    "dry_steppe": ("desert_settlement", "oasis_town", "tags", frozenset({"oasis"})),
+}
+RESOURCE_CATEGORY_RULES = (
+    (frozenset({"grain", "livestock"}), "farming_village"),
+    (frozenset({"wood"}), "logging_village"),
+    (frozenset({"stone", "metal_ore"}), "mining_village"),
+)
+
+# (type, resource keys, tag keys, climates, biomes, excluded climates)
+# A type applies when any key/climate/biome matches and the climate is not excluded.
+SETTLEMENT_TYPE_RULES = (
+    # --- ECONOMIC SPECIALIZATION ---
+    ("agrarian", frozenset({"grain", "livestock"}), frozenset(), frozenset(), frozenset(), COLD_CLIMATES),
+    ("logging", frozenset({"wood"}), frozenset(), frozenset(), frozenset(), frozenset()),
+    ("mining", frozenset({"stone", "metal_ore"}), frozenset(), frozenset(), frozenset(), frozenset()),
+    ("luxury_goods", frozenset({"spices", "silk", "luxury_wood", "incense"}), frozenset(), frozenset(), frozenset(), frozenset()),
+    # --- TRADE --- (temperate climates usually produce surplus for trade)
+    ("trade_focused", frozenset(), frozenset({"trade_hub"}), frozenset({"temperate"}), frozenset(), frozenset()),
+    ("river_trade", frozenset(), frozenset({"river", "riverside"}), frozenset(), frozenset(), frozenset()),
+    ("maritime_trade", frozenset(), frozenset({"coastal"}), frozenset(), frozenset(), frozenset()),
+    # --- MILITARY / STRATEGIC ---
+    ("militaristic", frozenset({"iron", "metal_ore"}), frozenset(), frozenset(), frozenset(), frozenset()),
+    ("defensive", frozenset(), frozenset({"border_conflict"}), frozenset(), frozenset({"mountain", "tundra"}), frozenset()),
+    # --- INDUSTRY ---
+    ("industrial", frozenset({"clay", "coal"}), frozenset(), frozenset(), frozenset(), frozenset()),
+)
+
+def assign_settlement_category(tile, resources=None):
     """
     Returns a high-level category string for a settlement.
     Considers climate, biome, and available tile resources.
+    Pass `resources` (from GetResourcesForTile) to avoid recomputing it.
     """
-    resources = GetResourcesForTile(tile)
+    if resources is None:
+        resources = GetResourcesForTile(tile)
     biome = tile.biome or "unknown"
     climate = tile.climate or "temperate"
-    tags = tile.tags or []
+    tags = tile.tag_set
 
     # --- SPECIAL TAG RULES ---
-    if "trade_hub" in tags:
-        return "trade_post"
-    if "military_path" in tags:
-        return "fort"
+    for tag, category in CATEGORY_TAG_RULES:
+        if tag in tags:
+            return category
 
     # --- CLIMATE / BIOME DRIVEN ---
-    if climate in ("polar", "subpolar") or biome in ("tundra", "cold_steppe"):
-        if "supplies_deficit" in tags or "hungry" in tags:
-            return "camp"
-        return "outpost"
-
-    if biome in ("forest", "rainforest"):
-        return "forest_village"
-
-    if biome in ("mountain", "alpine"):
-        if "iron" in resources or "metal_ore" in resources:
-            return "mining_camp"
-        return "mountain_hamlet"
-
-    if biome in ("desert", "dry_steppe"):
-        if "oasis" in tags:
-            return "oasis_town"
-        return "desert_settlement"
+    if climate in COLD_CLIMATES or biome in COLD_BIOMES:
+        rule = COLD_CATEGORY_RULE
+    else:
+        rule = BIOME_CATEGORY_RULES.get(biome)
+
+    if rule:
+        default, upgraded, source, keys = rule
+        pool = tags if source == "tags" else resources.keys()
+        if upgraded and not keys.isdisjoint(pool):
+            return upgraded
+        return default
 
     # --- RESOURCE BASED ---
-    if "grain" in resources or "livestock" in resources:
-        return "farming_village"
-
-    if "wood" in resources:
-        return "logging_village"
-
-    if "stone" in resources or "metal_ore" in resources:
-        return "mining_village"
+    for keys, category in RESOURCE_CATEGORY_RULES:
+        if not keys.isdisjoint(resources.keys()):
+            return category
 
     # --- DEFAULT ---
     return "village"
 
 
-def assign_settlement_types(tile):
+def assign_settlement_types(tile, resources=None):
     """
     Returns a list of traits describing the settlement.
     Considers climate, biome, and resource profile.
+    Pass `resources` (from GetResourcesForTile) to avoid recomputing it.
     """
-    types = []
-    resources = GetResourcesForTile(tile)
+    if resources is None:
+        resources = GetResourcesForTile(tile)
     biome = tile.biome or "unknown"
     climate = tile.climate or "temperate"
-    tags = tile.tags or []
-
-    # --- ECONOMIC SPECIALIZATION ---
-    if "grain" in resources or "livestock" in resources:
-        if climate not in ("polar", "subpolar"):
-            types.append("agrarian")
-
-    if "wood" in resources:
-        types.append("logging")
-
-    if "stone" in resources or "metal_ore" in resources:
-        types.append("mining")
-
-    if any(r in resources for r in ("spices", "silk", "luxury_wood", "incense")):
-        types.append("luxury_goods")
-
-    # --- TRADE ---
-    if "trade_hub" in tags or climate == "temperate":
-        # temperate climates usually produce surplus for trade
-        types.append("trade_focused")
+    tags = tile.tag_set
+    res_keys = resources.keys()
 
-    if "river" in tags or "riverside" in tags:
-        types.append("river_trade")
-
-    if "coastal" in tags:
-        types.append("maritime_trade")
-
-    # --- MILITARY / STRATEGIC ---
-    if "iron" in resources or "metal_ore" in resources:
-        types.append("militaristic")
-
-    if "border_conflict" in tags or biome in ("mountain", "tundra"):
-        types.append("defensive")
-
-    # --- INDUSTRY ---
-    if "clay" in resources or "coal" in resources:
-        types.append("industrial")
+    types = []
+    for stype, res_rule, tag_rule, climates, biomes, excluded in SETTLEMENT_TYPE_RULES:
+        if climate in excluded:
+            continue
+        if (not res_rule.isdisjoint(res_keys) or not tag_rule.isdisjoint(tags)
+                or climate in climates or biome in biomes):
+            types.append(stype)
 
     # --- MONOPOLISTIC RESOURCE TYPE ---
     if len(resources) == 1:
@@ -261,87 +356,100 @@ def assign_settlement_types(tile):
 
     return types
 
-def InitializeSettlementEconomy(world, rng: Random):
-    for row in world:
-        for tile in row:
-            if not isinstance(tile, TileState): continue
-            if tile.terrain != "settlement": continue
-
-            origin_terrain = tile.origin_terrain or "plains"
-
-            # Use per-tile resource detection (considers tags & origin terrain)
-            base_resources = GetResourcesForTile(tile)  # <- FIX: pass tile, not a terrain name
-            subs = {k: round(v * rng.uniform(0.5, 1.5), 2) for k, v in base_resources.items()}
-
-            # --- NEW: Apply Regional Trait Bonuses to initial sub-commodities (Initialization) ---
-            region_tags = get_region_resource_tags(tile)
-
-            for trait in region_tags:
-                resources_to_boost = REGION_TRAIT_BONUSES.get(trait, [])
-                for r_name in resources_to_boost:
-                    if r_name in subs:
-                        # Give a strong initial bonus if the settlement is in a resource-rich region
-                        subs[r_name] = round(subs[r_name] * rng.uniform(1.0, REGION_MULTIPLIER_INIT), 3)
-
-            base_supplies = rng.uniform(80, 150)
-            base_wealth = rng.uniform(50, 120)
-            base_population = rng.uniform(80, 300)
-            base_prosperity = base_supplies + base_wealth - base_population * 0.2
-
-            econ = {
-                "id": rng.randint(1, 9999),
-                "settlement_category": assign_settlement_category(tile),
-                "settlement_type": assign_settlement_types(tile),
-                "name": f"Settlement_{tile.x}_{tile.y}",
-                "population": base_population,
-                "supplies": base_supplies,
-                "prosperity": base_prosperity,
-                "power_projection": base_prosperity * 0.1,
-                "production": rng.uniform(6, 10),
-                "consumption": rng.uniform(5, 8),
-                "wealth": base_wealth,
-                "price_multiplier": 1.0,
-                "sub_commodities": subs,
-                "origin_terrain": tile.origin_terrain or tile.terrain,
-                "biome": tile.biome or "unknown"
-            }
-
-            tile.attach_system("economy", econ)
-    return world
+def _build_settlement_economy(tile, rng: Random, settlement_id: int):
+    """Create the initial economy dict for one settlement tile."""
+    # rng.uniform(a, b) is a + (b - a) * rng.random(); drawing through the bound
+    # method directly keeps the exact same stream without the per-call overhead.
+    rand = rng.random
 
-def InitializeAllRelationships(world):
-    all_entities = []
+    # Use per-tile resource detection (considers tags & origin terrain)
+    base_resources = GetResourcesForTile(tile)  # <- FIX: pass tile, not a terrain name
+    subs = {k: round(v * (0.5 + rand()), 2) for k, v in base_resources.items()}
+
+    # --- NEW: Apply Regional Trait Bonuses to initial sub-commodities (Initialization) ---
+    region_tags = get_region_resource_tags(tile)
+    region_init_span = REGION_MULTIPLIER_INIT - 1.0
+
+    for trait in region_tags:
+        resources_to_boost = REGION_TRAIT_BONUSES.get(trait, [])
+        for r_name in resources_to_boost:
+            if r_name in subs:
+                # Give a strong initial bonus if the settlement is in a resource-rich region
+                subs[r_name] = round(subs[r_name] * (1.0 + region_init_span * rand()), 3)
+
+    # Scalar draws in one batch (same order as before: supplies, wealth,
+    # population, production, consumption)
+    r_sup, r_wea, r_pop, r_prod, r_cons = rand(), rand(), rand(), rand(), rand()
+    base_supplies = 80 + 70 * r_sup
+    base_wealth = 50 + 70 * r_wea
+    base_population = 80 + 220 * r_pop
+    base_prosperity = base_supplies + base_wealth - base_population * 0.2
+
+    settlement_types = assign_settlement_types(tile, base_resources)
+    return {
+        "id": settlement_id,
+        "settlement_category": assign_settlement_category(tile, base_resources),
+        "settlement_type": settlement_types,
+        "type_mask": get_settlement_type_mask(settlement_types),
+        "name": f"Settlement_{tile.x}_{tile.y}",
+        "population": base_population,
+        "supplies": base_supplies,
+        "prosperity": base_prosperity,
+        "power_projection": base_prosperity * 0.1,
+        "production": 6 + 4 * r_prod,
+        "consumption": 5 + 3 * r_cons,
+        "wealth": base_wealth,
+        "price_multiplier": 1.0,
+        "sub_commodities": subs,
+        "region_boost": GetRegionBoostMultipliers(tile),
+        "origin_terrain": tile.origin_terrain or tile.terrain,
+        "biome": tile.biome or "unknown"
+    }
 
+def InitializeWorldSystems(world, rng: Random):
+    """
+    Single world pass for startup: attach each settlement's economy, create
+    its settlement AI entity, and collect entities; then one relationship pass.
+    """
+    next_id = 1  # monotonic settlement IDs (unique, used as index keys)
+    all_entities = []
     for row in world:
         for tile in row:
+            if not isinstance(tile, TileState): continue
+            if tile.terrain == "settlement":
+                tile.attach_system("economy", _build_settlement_economy(tile, rng, next_id))
+                next_id += 1
+                tile.entities.append(CreateSettlementAI(tile))
             if tile.entities:
                 all_entities.extend(tile.entities)
 
-    # Initialize
+    InitializeRelationships(all_entities)
+    return world
+
+def InitializeRelationships(all_entities):
     for ent in all_entities:
         rel = ent.components.get("relationship")
         if rel:
             rel.initialize(ent, all_entities)
 
-def AttachSettlementAgents(world):
+def InitializeAllRelationships(world):
+    all_entities = []
+
     for row in world:
         for tile in row:
-            econ = tile.get_system("economy")
-            if econ:
-                ent = CreateSettlementAI(tile)
-                tile.entities.append(ent)
-
+            if tile.entities:
+                all_entities.extend(tile.entities)
 
-    # NOW initialize relationships
-    InitializeAllRelationships(world)
+    InitializeRelationships(all_entities)
 
 def SimulateSettlementEconomy(world, director=None, rng=None):
-    import random
-    rng = rng or random.Random()
-
     BASE_PROD_PER_CAPITA = 0.08
     BASE_CONS_PER_CAPITA = 0.07
 
+    # The math helpers (tanh_eq, sigmoid_lite, diminishing, logistic) are
+    # inlined below; this loop runs per settlement per tick.
+    exp = math.exp
+    tanh = math.tanh
 
     for tile in GetActiveTiles(world, "economy"):
         econ = tile.get_system("economy")
@@ -350,77 +458,105 @@ def SimulateSettlementEconomy(world, director=None, rng=None):
 
         # --- Weather influence -----------------------------------------
         weather = tile.get_system("weather")
-        weather_mod = 1.0
+        prod_factor = DEFAULT_PROD_FACTOR
         if weather:
-            state = weather.get("state", "")
-            if state == "rain":
-                weather_mod = 1.1
-            elif state == "storm":
-                weather_mod = 0.9
-            elif state == "drought":
-                weather_mod = 0.6
+            prod_factor = WEATHER_PROD_FACTOR.get(weather.get("state", ""), DEFAULT_PROD_FACTOR)
 
         # --- Core production/consumption -------------------------------
+        # The write below keeps population >= 10, so it is safe as a divisor;
+        # the read-side clamp only guards against external writers.
         population = econ["population"]
-        prod = population * BASE_PROD_PER_CAPITA
-        prod *= logistic(weather_mod, midpoint=1.0, k=4.0)  # stable weather effect
+        if population < 10:
+            population = 10
+        supplies = econ["supplies"]
+        prod = population * BASE_PROD_PER_CAPITA * prod_factor  # stable weather effect
 
-        stress_factor = tanh_eq(1.0 - (econ["supplies"] / max(population, 1)), 1.5)
+        stress_factor = tanh((1.0 - supplies / population) * 1.5)
         cons = population * BASE_CONS_PER_CAPITA * (1.0 + 0.1 * stress_factor)
 
         delta = prod - cons
         if delta < 0:
             director.register_signal("econ_food_shortage", delta)
 
-        econ["supplies"] = max(0.0, econ["supplies"] + sigmoid_lite(delta, 5.0))
+        supplies = max(0.0, supplies + delta / (abs(delta) + 5.0))
+        econ["supplies"] = supplies
 
         # --- Wealth change from surplus or deficit ---------------------
-        econ["wealth"] += diminishing(max(delta, 0), power=0.7)
-        econ["wealth"] = max(0.0, econ["wealth"])
+        wealth = max(0.0, econ["wealth"] + max(delta, 0) ** 0.7)
+        econ["wealth"] = wealth
 
         # --- Population responds to living conditions -----------------
-        supply_ratio = econ["supplies"] / max(1.0, population)
-        wealth_ratio = econ["wealth"] / 100.0
-
-        growth_pressure = 0.5 * sigmoid_lite(supply_ratio - 1.0, 0.3) \
-                          + 0.5 * sigmoid_lite(wealth_ratio - 0.5, 0.3)
+        s_x = supplies / population - 1.0   # supply ratio vs 1.0
+        w_x = wealth / 100.0 - 0.5          # wealth ratio vs 0.5
+        growth_pressure = 0.5 * (s_x / (abs(s_x) + 0.3) + w_x / (abs(w_x) + 0.3))
 
         # logistic prevents chaotic spikes
-        growth_rate = logistic(growth_pressure, midpoint=0.5, k=4.0)
+        growth_rate = 1.0 / (1.0 + exp(-4.0 * (growth_pressure - 0.5)))
 
-        econ["population"] = int(max(10, population * growth_rate))
+        new_population = population * growth_rate
+        if new_population < 10:
+            new_population = 10
+        econ["population"] = int(new_population)
 
         # --- Sub-commodity fluctuations --------------------------------
-        subs = econ.get("sub_commodities", {})
-        for name, value in subs.items():
-            drift = tanh_eq(delta * 0.002, 0.5)
-            subs[name] = max(0.0, round(value + drift, 3))
-        econ["sub_commodities"] = subs
+        # Drift is the same for every commodity; subs is econ's own dict, so
+        # the in-place write is the only store.
+        subs = econ.get("sub_commodities")
+        if subs:
+            drift = tanh(delta * 0.002 * 0.5)
+            for name, value in subs.items():
+                subs[name] = max(0.0, round(value + drift, 3))
 
         commodities_mod = ComputeSubCommoditiesModifier(tile)
 
         econ["wealth"] += commodities_mod
 
-        pp_base = diminishing(econ["wealth"], 0.5) \
-                  + diminishing(econ["population"], 0.5)
+        pp_base = econ["wealth"] ** 0.5 + econ["population"] ** 0.5
 
         pp = 0.7 * econ["power_projection"] + 0.3 * pp_base
         econ["power_projection"] = pp
 
-        LogEntityEvent(
-            tile,
-            "ECONOMY SIMULATION",
-            f"Current settlement power projection is {econ['power_projection']}.",
-        )
+        if LOG_ECONOMY_TICKS:
+            LogEntityEvent(
+                tile,
+                "ECONOMY SIMULATION",
+                f"Current settlement power projection is {econ['power_projection']}.",
+            )
 
         # econ["price_multiplier"] = ComputeSupplyDemandPrice(econ)
-        econ["price_multiplier"] = econ["price_multiplier"] = 1.0 + sigmoid_lite((cons - prod), 10.0) * 0.5
+        price_x = cons - prod
+        econ["price_multiplier"] = 1.0 + price_x / (abs(price_x) + 10.0) * 0.5
 
         # --- Record tick history --------------------------------------
         # RecordEconomyHistory(econ)
 
     return world
 
+def GetTypeBoostMultipliers(type_mask):
+    """
+    Collapse a settlement's type mask into per-tick boost multipliers.
+    Returns (all_mult, {resource_category: mult}); a resource's total
+    boost is all_mult * category_mult.get(category, 1.0).
+    Results are memoized per mask (only a handful of combinations occur).
+    """
+    cached = _TYPE_BOOST_CACHE.get(type_mask)
+    if cached is not None:
+        return cached
+
+    all_mult = 1.0
+    category_mult = {}
+    for stype, bit in SETTLEMENT_TYPE_BITS.items():
+        if not type_mask & bit:
+            continue
+        if stype in TYPE_ALL_BOOST:
+            all_mult *= TYPE_ALL_BOOST[stype]
+            continue
+        for category in TYPE_TO_RESOURCE_TYPES[stype]:
+            category_mult[category] = category_mult.get(category, 1.0) * TYPE_CATEGORY_BOOST
+
+    cached = _TYPE_BOOST_CACHE[type_mask] = (all_mult, category_mult)
+    return cached
+
 def ComputeSubCommoditiesModifier(tile):
     """
     Broad category modifier: food/material/trade/luxury
@@ -430,60 +566,31 @@ def ComputeSubCommoditiesModifier(tile):
     types = econ.get("settlement_type", [])
     subs = econ.get("sub_commodities", {})
 
-    # --- NEW: Apply Regional Trait Bonuses (Persistent Boost) ---
-    region_tags = get_region_resource_tags(tile)
-    for trait in region_tags:
-        resources_to_boost = REGION_TRAIT_BONUSES.get(trait, [])
-        for name in subs:
-            if name in resources_to_boost:
-                # Apply small persistent tick boost
-                subs[name] *= REGION_MULTIPLIER_TICK
+    region_boost = econ.get("region_boost")
+    if region_boost is None:
+        region_boost = econ["region_boost"] = GetRegionBoostMultipliers(tile)
 
-    if not types or not subs:
+    if not subs:
         return 0.0
 
-    TYPE_TO_RESOURCE_TYPES = {
-        "agrarian": ["food"],
-        "logging": ["material"],
-        "mining": ["material", "trade"],
-        "luxury_goods": ["luxury", "trade"],
-        "trade_focused": ["all"],
-        "river_trade": ["food", "trade"],
-        "maritime_trade": ["food", "trade"],
-        "militaristic": ["material"],
-        "defensive": [],
-        "industrial": ["material"],
-        "monopolistic": ["all"],
-    }
-
-    # gentle category boosts before wealth calc
-    for stype in types:
-        res_types = TYPE_TO_RESOURCE_TYPES.get(stype, [])
-
-        if res_types == ["all"] and stype == "trade_focused":
-            for name in subs:
-                subs[name] *= 1.03  # gentler
-            continue
-
-        if res_types == ["all"] and stype == "monopolistic":
-            # strong early, weaker later
-            for name in subs:
-                subs[name] *= 1.12
-            continue
-
+    if not types:
+        # --- NEW: Apply Regional Trait Bonuses (Persistent Boost) ---
         for name in subs:
-            category = GetResourceType(name)
-            if category in res_types:
-                subs[name] *= 1.06  # +6% gentle boost
-
-    # round for stability
-    for k in subs:
-        subs[k] = round(subs[k], 3)
-
-    econ["sub_commodities"] = subs
+            if name in region_boost:
+                subs[name] *= region_boost[name]
+        return 0.0
 
-    # aggregate sub_commodity score
-    total_strength = sum(subs.values())
+    # Single pass: regional trait boost (persistent), gentle category boost
+    # from settlement types, round for stability, aggregate strength.
+    all_mult, category_mult = GetTypeBoostMultipliers(_get_type_mask(econ))
+    resource_type = RESOURCE_TYPE_BY_NAME.get
+    total_strength = 0.0
+    for name, value in subs.items():
+        value = value * region_boost.get(name, 1.0) \
+                * (all_mult * category_mult.get(resource_type(name, "unknown"), 1.0))
+        value = round(value, 3)
+        subs[name] = value
+        total_strength += value
 
     # wealth gain = diminishing returns
     wealth_gain = diminishing(total_strength, power=0.65)
@@ -518,9 +625,13 @@ def ComputeSupplyDemandPrice(econ):
 
 
 
+def pick_random_sub_commodity(subs: dict, rng):
+    """
+    Same draw as rng.choice(list(subs)), without materializing the key list.
+    """
+    return next(islice(subs, rng.randrange(len(subs)), None))
+
 def RandomSettlementPerturbation(world, macro, clock, region=None):
-    from random import choice
-    import random
 
     # rng = random.Random(clock.global_tick * 100 + clock.local_tick)
     rng = clock.rng
@@ -529,7 +640,7 @@ def RandomSettlementPerturbation(world, macro, clock, region=None):
     # Pick a few random settlements to perturb this tick
     for vid in rng.sample(settlement_ids, min(3, len(settlement_ids))):
         tile, econ = GetSettlementByID(world, vid)
-        agent = SettlementEconomyAgent(tile)
+        agent = SettlementEconomyAgent(tile, rng)
 
         # Randomly fluctuate economy a bit
         if rng.random() < 0.5:
@@ -539,7 +650,7 @@ def RandomSettlementPerturbation(world, macro, clock, region=None):
         if rng.random() < 0.3:
             # Affect a random commodity
             if econ["sub_commodities"]:
-                cname = choice(list(econ["sub_commodities"].keys()))
+                cname = pick_random_sub_commodity(econ["sub_commodities"], rng)
                 agent.add_sub_commodity(0.5, cname)
 
         # print(f"[Tick {clock.global_tick}:{clock.local_tick:02d}] Perturbed {econ['name']} → {agent.summary()}")
@@ -547,48 +658,53 @@ def RandomSettlementPerturbation(world, macro, clock, region=None):
 def RecordEconomyHistory(econ: dict, max_length: int = 30):
     """
     Append per-tick history of supplies, wealth, and sub_commodities.
-    Keeps only the last `max_length` entries.
+    Keeps only the last `max_length` entries (bounded deques trim themselves).
     """
-    history = econ.setdefault("history", {
-        "supplies": [],
-        "wealth": [],
-        "sub_commodities": {}
-    })
+    history = econ.get("history")
+    if history is None:
+        history = econ["history"] = {
+            "supplies": deque(maxlen=max_length),
+            "wealth": deque(maxlen=max_length),
+            "sub_commodities": {}
+        }
 
     # Record main stats
     history["supplies"].append(econ["supplies"])
     history["wealth"].append(econ["wealth"])
 
     # Record sub-commodities
+    sub_hist = history["sub_commodities"]
     for name, value in econ.get("sub_commodities", {}).items():
-        history["sub_commodities"].setdefault(name, []).append(value)
-        # Trim sub-commodity list
-        if len(history["sub_commodities"][name]) > max_length:
-            del history["sub_commodities"][name][0]
-
-    # Trim core lists
-    if len(history["supplies"]) > max_length:
-        del history["supplies"][0]
-    if len(history["wealth"]) > max_length:
-        del history["wealth"][0]
+        series = sub_hist.get(name)
+        if series is None:
+            series = sub_hist[name] = deque(maxlen=max_length)
+        series.append(value)
 
-    econ["history"] = history
+# Per-settlement fallback RNGs for SettlementEconomyAgent, keyed by economy id.
+# Kept out of the econ dict so economy data stays JSON-serializable.
+_AGENT_RNGS = {}
 
-import random
+def _get_agent_rng(settlement_id):
+    rng = _AGENT_RNGS.get(settlement_id)
+    if rng is None:
+        rng = _AGENT_RNGS[settlement_id] = random.Random(settlement_id)
+    return rng
 
 class SettlementEconomyAgent:
     """
     Wrapper class for manipulating a single Settlement's economy data easily.
     Provides simple random incremental changes to supplies, wealth, and sub-commodities.
+    Pass `rng` (e.g. clock.rng) to draw from the caller's stream; otherwise a
+    persistent per-settlement Random seeded from the economy id is reused.
     """
 
-    def __init__(self, tile):
+    def __init__(self, tile, rng=None):
         econ = tile.get_system("economy")
         if not econ:
             raise ValueError(f"Tile at ({tile.x}, {tile.y}) is not a Settlement or has no economy system.")
         self.tile = tile
         self.econ = econ
-        self.rng = random.Random(econ["id"])
+        self.rng = rng or _get_agent_rng(econ["id"])
 
     # --- Core Adjusters ----------------------------------------------------
 
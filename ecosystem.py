@@ -1,90 +1,120 @@
 # directory ecosystem.py/
 from typing import Dict
+import math
 from random import Random
 from tile_state import TileState
 from world_utils import GetActiveTiles
 
 # --- MASTER SPECIES DEFINITIONS (unchanged) -------------------------------
-flora_species = {"grass", "acacia", "tree", "fern", "moss", "reed", "lotus", "cactus", "shrub"}
-herbivore_species = {"antelope", "elephant", "reindeer", "frog", "fish", "bird"}
-carnivore_species = {"lion", "wolf", "snake", "scorpion", "crane", "lizard"}
-omnivore_species = {"monkey"}
+flora_species = frozenset({"grass", "acacia", "tree", "fern", "moss", "reed", "lotus", "cactus", "shrub"})
+herbivore_species = frozenset({"antelope", "elephant", "reindeer", "frog", "fish", "bird"})
+carnivore_species = frozenset({"lion", "wolf", "snake", "scorpion", "crane", "lizard"})
+omnivore_species = frozenset({"monkey"})
+fauna_species = herbivore_species | carnivore_species | omnivore_species
 
 flora_tag = "flora"
 fauna_tag = "fauna"
 
-SPECIES = {
-    s: {"terrain": flora_tag, "trophic": "producer"} for s in flora_species
-} | {
-    s: {"terrain": fauna_tag, "trophic": "herbivore"} for s in herbivore_species
-} | {
-    s: {"terrain": fauna_tag, "trophic": "carnivore"} for s in carnivore_species
-} | {
-    s: {"terrain": fauna_tag, "trophic": "omnivore"} for s in omnivore_species
-}
+# Trophic level id per species (0 producer, 1 herbivore, 2 carnivore, 3 omnivore)
+PRODUCER, HERBIVORE, CARNIVORE, OMNIVORE = 0, 1, 2, 3
+
+# (species group, terrain tag, trophic name, trophic id)
+SPECIES_GROUPS = (
+    (flora_species, flora_tag, "producer", PRODUCER),
+    (herbivore_species, fauna_tag, "herbivore", HERBIVORE),
+    (carnivore_species, fauna_tag, "carnivore", CARNIVORE),
+    (omnivore_species, fauna_tag, "omnivore", OMNIVORE),
+)
+
+SPECIES = {}
+TROPHIC_OF = {}
+for _group, _terrain, _trophic, _level in SPECIES_GROUPS:
+    _info = {"terrain": _terrain, "trophic": _trophic}  # shared per group, treat as read-only
+    for _s in _group:
+        SPECIES[_s] = _info
+        TROPHIC_OF[_s] = _level
+del _group, _terrain, _trophic, _level, _info, _s
 
 # --- Utilities ------------------------------------------------------------
 def is_flora(species: str) -> bool: return species in flora_species
-def is_fauna(species: str) -> bool: return species in herbivore_species | carnivore_species | omnivore_species
+def is_fauna(species: str) -> bool: return species in fauna_species
 def get_trophic(species: str) -> str: return SPECIES.get(species, {}).get("trophic", "unknown")
 
 # --- Flora and Fauna Seeding ---------------------------------------------
-def SeedFloraFauna(world, rng: Random):
-    biome_flora = {
-        "rainforest": {"tree": 0.7, "fern": 0.9, "moss": 0.6},
-        "forest": {"tree": 0.7, "fern": 0.9, "moss": 0.6},
-        "savanna": {"grass": 1.0, "acacia": 0.5},
-        "tundra": {"moss": 0.5},
-        "permafrost": {"moss": 0.5, "shrub": 0.5},
-        "desert": {"cactus": 0.4, "shrub": 0.3},
-        "scrubland": {"cactus": 0.4, "shrub": 0.3},
-        "wetland": {"reed": 0.8, "lotus": 0.4},
-    }
-    biome_fauna = {
-        "rainforest": {"monkey": 0.05, "snake": 0.03, "bird": 0.1},
-        "forest": {"monkey": 0.05, "snake": 0.03, "bird": 0.1},
-        "savanna": {"antelope": 0.08, "elephant": 0.02, "lion": 0.008},
-        "tundra": {"reindeer": 0.06, "wolf": 0.01},
-        "permafrost": {"reindeer": 0.05, "wolf": 0.04},
-        "desert": {"lizard": 0.06, "scorpion": 0.02},
-        "scrubland": {"lizard": 0.06, "scorpion": 0.02},
-        "wetland": {"frog": 0.07, "fish": 0.1, "crane": 0.03},
-    }
+BIOME_FLORA = {
+    "rainforest": {"tree": 0.7, "fern": 0.9, "moss": 0.6},
+    "forest": {"tree": 0.7, "fern": 0.9, "moss": 0.6},
+    "savanna": {"grass": 1.0, "acacia": 0.5},
+    "tundra": {"moss": 0.5},
+    "permafrost": {"moss": 0.5, "shrub": 0.5},
+    "desert": {"cactus": 0.4, "shrub": 0.3},
+    "scrubland": {"cactus": 0.4, "shrub": 0.3},
+    "wetland": {"reed": 0.8, "lotus": 0.4},
+}
+BIOME_FAUNA = {
+    "rainforest": {"monkey": 0.05, "snake": 0.03, "bird": 0.1},
+    "forest": {"monkey": 0.05, "snake": 0.03, "bird": 0.1},
+    "savanna": {"antelope": 0.08, "elephant": 0.02, "lion": 0.008},
+    "tundra": {"reindeer": 0.06, "wolf": 0.01},
+    "permafrost": {"reindeer": 0.05, "wolf": 0.04},
+    "desert": {"lizard": 0.06, "scorpion": 0.02},
+    "scrubland": {"lizard": 0.06, "scorpion": 0.02},
+    "wetland": {"frog": 0.07, "fish": 0.1, "crane": 0.03},
+}
+BIOME_KEYS = frozenset(BIOME_FLORA)
+
+def SeedFloraFauna(world, rng: Random, scale_factor_flora=300, scale_factor_fauna=100):
+    # Seeds biota straight at integer count scale.
+    # rng.uniform(0.8, 1.2) expanded inline: identical stream, no per-call overhead
+    rand = rng.random
+    span = 1.2 - 0.8
+    empty = {}
 
     for row in world:
         for tile in row:
             if not isinstance(tile, TileState):
                 continue
-            biome = next((tag for tag in tile.tags if tag in biome_flora), None)
-            flora = biome_flora.get(biome, {})
-            fauna = biome_fauna.get(biome, {})
+            # Most tiles carry no biome tag at all; only scan (in tag order,
+            # first match wins) when the hashed tag set says there is one.
+            if BIOME_KEYS.isdisjoint(tile.tag_set):
+                flora = fauna = empty
+            else:
+                biome = next(tag for tag in tile.tags if tag in BIOME_KEYS)
+                flora = BIOME_FLORA[biome]
+                fauna = BIOME_FAUNA[biome]
             tile.attach_system("biota", {
-                "flora": {k: v * rng.uniform(0.8, 1.2) for k, v in flora.items()},
-                "fauna": {k: v * rng.uniform(0.8, 1.2) for k, v in fauna.items()},
+                "flora": {k: int(v * (0.8 + span * rand()) * scale_factor_flora) for k, v in flora.items()},
+                "fauna": {k: int(v * (0.8 + span * rand()) * scale_factor_fauna) for k, v in fauna.items()},
             })
     return world
 
-def ConvertBiotaToCounts(world, scale_factor_flora=300, scale_factor_fauna=100):
-    for tile in GetActiveTiles(world, "biota"):
-        if not isinstance(tile, TileState): continue
-        biota = tile.get_system("biota")
-        if not biota: continue
-        flora_counts = {k: int(v * scale_factor_flora) for k, v in biota["flora"].items()}
-        fauna_counts = {k: int(v * scale_factor_fauna) for k, v in biota["fauna"].items()}
-        tile.attach_system("biota", {"flora": flora_counts, "fauna": fauna_counts})
-    return world
+# Default schemas for the systems SimulateEco reads on every eco tile
+DEFAULT_WEATHER = {"state": "clear_weather"}
+DEFAULT_HUMIDITY = {"current": 0.5}
+DEFAULT_SOIL = {"fertility": 0.5}
 
 def InitializeEcosystemFromBiota(world, rng: Random):
+    trophic_of = TROPHIC_OF.get
     for row in world:
         for tile in row:
             if not isinstance(tile, TileState): continue
+            # Guarantee the systems SimulateEco reads, so it can index fields directly
+            tile.ensure_system("weather", DEFAULT_WEATHER)
+            tile.ensure_system("humidity", DEFAULT_HUMIDITY)
+            tile.ensure_system("soil", DEFAULT_SOIL)
             biota = tile.get_system("biota") or {}
             flora = biota.get("flora", {})
             fauna = biota.get("fauna", {})
-            producers_sum = sum(v for k, v in flora.items() if k in flora_species)
-            herb_sum = sum(v for k, v in fauna.items() if k in herbivore_species)
-            carn_sum = sum(v for k, v in fauna.items() if k in carnivore_species)
-            omni_sum = sum(v for k, v in fauna.items() if k in omnivore_species)
+            # One pass per dict, bucketed by trophic id
+            sums = [0, 0, 0, 0]
+            for k, v in flora.items():
+                if trophic_of(k) == PRODUCER:
+                    sums[PRODUCER] += v
+            for k, v in fauna.items():
+                level = trophic_of(k)
+                if level:  # None (unknown) and producers are skipped
+                    sums[level] += v
+            producers_sum, herb_sum, carn_sum, omni_sum = sums
             herb_sum += omni_sum * 0.5
             carn_sum += omni_sum * 0.5
             tile.attach_system("eco", {
@@ -94,6 +124,89 @@ def InitializeEcosystemFromBiota(world, rng: Random):
             })
     return world
 
+# --- Ecosystem simulation -------------------------------------------------
+ECO_NOISE_SCALE = 0.015  # +/- relative per-tick population noise
+
+# Trophic interaction matrix: row = population being updated, column = the
+# population driving it (producers, herbivores, carnivores). The producer
+# diagonal is the logistic growth rate; other entries are per-capita
+# feeding gains (+) and losses (-). Zero entries are links absent from the web.
+ECO_TROPHIC_MATRIX = (
+    (0.05, -0.01, 0.0),
+    (0.02, -0.008, -0.03),
+    (0.0, 0.015, -0.02),
+)
+
+def _eco_trophic_step(prod_a, herb_a, carn_a, growth_a, mort_a, season_a, noise, dt, K):
+    """
+    Logistic producers + predator/prey step for every tile, in place.
+    Flat float sequences only (one entry per tile, noise has three per tile),
+    no tile or dict access, so the loop can be compiled or sharded as-is.
+    Coefficients come from ECO_TROPHIC_MATRIX; gains scale with growth
+    (and season for plant-driven terms), losses with mortality.
+    """
+    (r_prod, a_ph, _), (a_hp, a_hh, a_hc), (_, a_ch, a_cc) = ECO_TROPHIC_MATRIX
+
+    for i in range(len(prod_a)):
+        prod = prod_a[i]
+        herb = herb_a[i]
+        carn = carn_a[i]
+        growth_mod = growth_a[i]
+        mortality_mod = mort_a[i]
+        season_factor = season_a[i]
+
+        d_producers = (
+            (r_prod * growth_mod * season_factor * prod * (1 - prod / K))
+            + a_ph * herb * mortality_mod
+        ) * dt
+
+        d_herbivores = (
+            (a_hp * prod * growth_mod * season_factor)
+            + a_hc * carn * mortality_mod
+            + a_hh * herb * mortality_mod
+        ) * dt
+
+        d_carnivores = (
+            (a_ch * herb * growth_mod)
+            + (a_cc * carn * mortality_mod)
+        ) * dt
+
+        # Controlled noise (reduced chaos)
+        j = 3 * i
+        prod_a[i] = max(0.0, prod + d_producers + noise[j] * prod)
+        herb_a[i] = max(0.0, herb + d_herbivores + noise[j + 1] * herb)
+        carn_a[i] = max(0.0, carn + d_carnivores + noise[j + 2] * carn)
+
+# Seasonal growth factor: 1 + 0.25 * sin(phase * SEASON_SIN_CYCLES * pi).
+# The phase only depends on world_time modulo the climate's season length,
+# so (factor, season name) is memoized per (climate, time-in-cycle).
+SEASON_SIN_CYCLES = {"temperate": 4, "tropical": 2, "polar": 2}
+SEASON_DAYS = {"temperate": 365 // 4, "tropical": 365 // 2, "polar": 365}
+_SEASON_LUT = {}
+
+def GetEcoSeason(climate, world_time):
+    """Return (season_factor, season_name) for temperate/tropical/polar."""
+    key = (climate, world_time % SEASON_DAYS[climate])
+    entry = _SEASON_LUT.get(key)
+    if entry is None:
+        # worldsim star-imports this module, so resolve GetSeason on first use
+        from worldsim import GetSeason
+        phase, season = GetSeason(climate, world_time)
+        entry = _SEASON_LUT[key] = (1 + 0.25 * math.sin(phase * SEASON_SIN_CYCLES[climate] * math.pi), season)
+    return entry
+
+# (growth_mod, mortality_mod) per climate and per weather state; anything else is neutral
+NEUTRAL_ECO_MODS = (1.0, 1.0)
+CLIMATE_ECO_MODS = {
+    "tropical": (1.2, 0.9),
+    "polar": (0.6, 1.3),
+}
+WEATHER_ECO_MODS = {
+    "rain": (1.15, 0.9),
+    "storm": (0.85, 1.2),
+    "drought": (0.6, 1.3),
+}
+
 def SimulateEco(world, rng=None, world_time=0, dt=1.0):
     """
     Unified ecosystem simulation.
@@ -106,126 +219,98 @@ def SimulateEco(world, rng=None, world_time=0, dt=1.0):
     - Produces explicit eco_risk tag per tile (used by trade route risk)
     """
 
-    import math
-    import random
-    from worldsim import GetSeason
-    from worldgen import GetNeighbors
-
     if isinstance(rng, int):
-        rng = random.Random(rng)
+        rng = Random(rng)
     elif rng is None:
-        rng = random.Random(world_time)
-
-    height = len(world)
-    width = len(world[0])
-
-    # Calculate these ONCE at the top of the function
-    phase_temp, season_temp = GetSeason("temperate", world_time)
-    temperate_seasonal_factor = 1 + 0.25 * math.sin(phase_temp * 4 * math.pi)
-
-    phase_trop, season_trop = GetSeason("tropical", world_time)
-    tropical_seasonal_factor = 1 + 0.25 * math.sin(phase_trop * 2 * math.pi)
+        rng = Random(world_time)
 
-    phase_pol, season_pol = GetSeason("polar", world_time)
-    polar_seasonal_factor = 1 + 0.25 * math.sin(phase_pol * 2 * math.pi)
-
-    for tile in GetActiveTiles(world, "eco"):
+    # Seasonal (factor, name) per climate for this tick, from the phase LUT
+    temperate_season = GetEcoSeason("temperate", world_time)
+    season_by_climate = {
+        "temperate": temperate_season,
+        "tropical": GetEcoSeason("tropical", world_time),
+    }
+    polar_season = GetEcoSeason("polar", world_time)
+
+    tiles = GetActiveTiles(world, "eco")
+    K = 800.0
+
+    # --- Gather: per-tile inputs into parallel arrays (structure of arrays) ---
+    ecos = []
+    biotas = []
+    w_states = []
+    prod_a = []
+    herb_a = []
+    carn_a = []
+    growth_a = []
+    mort_a = []
+    season_a = []
+
+    for tile in tiles:
         eco = tile.ensure_system("eco", {"producers": 300, "herbivores": 60, "carnivores": 10})
         biota = tile.get_system("biota") or {}
-        weather = tile.get_system("weather") or {}
-        humidity = tile.get_system("humidity") or {"current": 0.5}
-        soil = tile.get_system("soil") or {"fertility": 0.5}
+        w_state = tile.ensure_system("weather", DEFAULT_WEATHER)["state"]
+        hum = tile.ensure_system("humidity", DEFAULT_HUMIDITY)["current"]
+        fert = tile.ensure_system("soil", DEFAULT_SOIL)["fertility"]
 
         climate = tile.climate or "temperate"
 
-        if climate == "temperate":
-            season_factor = temperate_seasonal_factor
-            eco["season"] = season_temp
-        elif climate == "tropical":
-            season_factor = tropical_seasonal_factor
-            eco["season"] = season_trop
-        else:
-            season_factor = polar_seasonal_factor
-            eco["season"] = season_pol
-
-        # Climate growth/mortality baseline
-        if climate == "tropical":
-            growth_mod = 1.2
-            mortality_mod = 0.9
-        elif climate == "polar":
-            growth_mod = 0.6
-            mortality_mod = 1.3
-        else:
-            growth_mod = 1.0
-            mortality_mod = 1.0
-
-        # Weather influence
-        w_state = weather.get("state", "")
-        if w_state == "rain":
-            growth_mod *= 1.15
-            mortality_mod *= 0.9
-        elif w_state == "storm":
-            growth_mod *= 0.85
-            mortality_mod *= 1.2
-        elif w_state == "drought":
-            growth_mod *= 0.6
-            mortality_mod *= 1.3
+        season_factor, eco["season"] = season_by_climate.get(climate, polar_season)
 
-        # Humidity & soil fertility impact
-        hum = humidity.get("current", 0.5)
-        fert = soil.get("fertility", 0.5)
+        # Climate baseline x weather influence on (growth, mortality)
+        growth_mod, mortality_mod = CLIMATE_ECO_MODS.get(climate, NEUTRAL_ECO_MODS)
+        w_growth, w_mort = WEATHER_ECO_MODS.get(w_state, NEUTRAL_ECO_MODS)
+        growth_mod *= w_growth
+        mortality_mod *= w_mort
 
+        # Humidity & soil fertility impact
         growth_mod *= (0.7 + hum * 0.3)
         growth_mod *= (0.6 + fert * 0.4)
 
-        # Trophic calculations
-        prod = eco["producers"]
-        herb = eco["herbivores"]
-        carn = eco["carnivores"]
-        K = 800.0
-
-        d_producers = (
-            (0.05 * growth_mod * season_factor * prod * (1 - prod / K))
-            - 0.01 * herb * mortality_mod
-        ) * dt
-
-        d_herbivores = (
-            (0.02 * prod * growth_mod * season_factor)
-            - 0.03 * carn * mortality_mod
-            - 0.008 * herb * mortality_mod
-        ) * dt
-
-        d_carnivores = (
-            (0.015 * herb * growth_mod)
-            - (0.02 * carn * mortality_mod)
-        ) * dt
-
-        # Controlled noise (reduced chaos)
-        def eco_noise(scale=0.015):
-            return rng.uniform(-scale, scale)
-
-        eco["producers"] = max(0.0, prod + d_producers + eco_noise() * prod)
-        eco["herbivores"] = max(0.0, herb + d_herbivores + eco_noise() * herb)
-        eco["carnivores"] = max(0.0, carn + d_carnivores + eco_noise() * carn)
-
-        # Sync back to biota counts
+        ecos.append(eco)
+        biotas.append(biota)
+        w_states.append(w_state)
+        prod_a.append(eco["producers"])
+        herb_a.append(eco["herbivores"])
+        carn_a.append(eco["carnivores"])
+        growth_a.append(growth_mod)
+        mort_a.append(mortality_mod)
+        season_a.append(season_factor)
+
+    # --- Trophic step over the arrays (pure arithmetic, no tile access) ---
+    # Noise is drawn up front in one batch, same per-tile order (prod, herb, carn).
+    # Expanded form of rng.uniform(-scale, scale): identical stream, no per-call overhead.
+    rand = rng.random
+    noise_lo = -ECO_NOISE_SCALE
+    noise_span = ECO_NOISE_SCALE - noise_lo
+    noise = [noise_lo + noise_span * rand() for _ in range(3 * len(tiles))]
+    _eco_trophic_step(prod_a, herb_a, carn_a, growth_a, mort_a, season_a, noise, dt, K)
+
+    # --- Scatter: write results back to tiles ---
+    for i, tile in enumerate(tiles):
+        eco = ecos[i]
+        biota = biotas[i]
+        eco["producers"] = prod_a[i]
+        eco["herbivores"] = herb_a[i]
+        eco["carnivores"] = carn_a[i]
+
+        # Sync back to biota counts (rescale species to the new trophic totals)
         flora = biota.get("flora", {})
         fauna = biota.get("fauna", {})
 
         if flora:
-            total_flora = sum(flora.values()) or 1
-            scale_f = eco["producers"] / total_flora
-            for k in flora:
-                flora[k] = int(flora[k] * scale_f)
+            scale_f = eco["producers"] / (sum(flora.values()) or 1)
+            flora = {k: int(v * scale_f) for k, v in flora.items()}
 
         if fauna:
-            total_fauna = sum(fauna.values()) or 1
-            scale_h = eco["herbivores"] / total_fauna
-            for k in fauna:
-                fauna[k] = int(fauna[k] * scale_h)
+            scale_h = eco["herbivores"] / (sum(fauna.values()) or 1)
+            fauna = {k: int(v * scale_h) for k, v in fauna.items()}
 
-        tile.attach_system("biota", {"flora": flora, "fauna": fauna})
-        tile.attach_system("eco", eco)
+        if biota:
+            biota["flora"] = flora
+            biota["fauna"] = fauna
+        else:
+            tile.attach_system("biota", {"flora": flora, "fauna": fauna})
 
         # Eco-risk descriptor → used by trade route risk
         carn_r = eco["carnivores"] / max(eco["herbivores"], 1)
@@ -234,10 +319,9 @@ def SimulateEco(world, rng=None, world_time=0, dt=1.0):
         risk_score = (
             0.5 * carn_r +
             0.3 * (1 - prod_r) +
-            (0.2 if w_state == "storm" else 0)
+            (0.2 if w_states[i] == "storm" else 0)
         )
 
         tile.attach_system("eco_risk", {"value": round(risk_score, 3)})
 
     return world
-
@@ -2,13 +2,26 @@
 from ..component import Component
 
 class AIComponent(Component):
-    def __init__(self, behavior_tree=None):
+    def __init__(self, behavior_tree=None, bt_context=None):
         super().__init__("ai")
         self.behavior_tree = behavior_tree
         self.blackboard = {}
+        # optional context of a tree shared between entities; its .entity is
+        # pointed at this component's entity before every tick
+        self.bt_context = bt_context
+        self.external_tick = False
 
     def update(self, world):
+        # a tree bound by another component (e.g. SettlementAIComponent) is
+        # ticked on that component's schedule, not on every entity update
+        if self.external_tick:
+            return
+        self.tick()
+
+    def tick(self):
         if self.behavior_tree:
+            if self.bt_context is not None:
+                self.bt_context.entity = self.entity
             # behavior tree nodes may rely on entity reference
             try:
                 self.behavior_tree.tick()
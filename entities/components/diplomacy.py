@@ -2,25 +2,33 @@
 from ..component import Component
 from world_utils import GetNearestTileWithSystem, GetActiveTiles, LogEntityEvent
 import world_index_store
+import math
 import random
 
+# Per-update chance of spreading a rumor. Instead of rolling every update, each
+# component counts down a geometric sample of updates until its next rumor.
+RUMOR_CHANCE = 0.1
+_LOG_RUMOR_MISS = math.log(1.0 - RUMOR_CHANCE)
+
+def _rumor_interval():
+    """Number of updates until the next rumor (geometric, success chance RUMOR_CHANCE)."""
+    return int(math.log(1.0 - random.random()) / _LOG_RUMOR_MISS) + 1
+
 class DiplomacyComponent(Component):
     def __init__(self):
         super().__init__("diplomacy")
         # simple relation store: {settlement_id: score}
         self.relations = {}
+        # updates left until the next rumor spread
+        self.rumor_countdown = _rumor_interval()
 
     def get_nearest_partner(self, world, radius=20):
         # uses world index
         tile = self.entity.tile
         widx = getattr(world_index_store, "world_index", None)
         if widx:
-            # find nearest economy tile excluding self
-            candidates = [t for t in widx.with_system("economy") if t != tile]
-            if not candidates:
-                return None
-            best = min(candidates, key=lambda t: (t.x - tile.x)**2 + (t.y - tile.y)**2)
-            return best
+            # find nearest economy tile excluding self (bucket-grid search)
+            return widx.nearest_with_system("economy", tile.x, tile.y, exclude=tile)
         # fallback: brute search
         return GetNearestTileWithSystem(world, tile.x, tile.y, "economy", max_radius=radius)
 
@@ -46,37 +54,31 @@ class DiplomacyComponent(Component):
             action = self.entity.get("action")
             action.trigger_event("request_aid")
 
-            # Broadcast help to all settlement
-            for otherSettlement in GetActiveTiles(world, "economy"):
+            # Broadcast help to all settlement: one shared, read-only payload,
+            # written straight into each recipient's pending aid requests.
+            src_tile = self.entity.tile
+            from_id = self.entity.id
+            request = {"from": (src_tile.x, src_tile.y), "reason": reason}
+            recipients = 0
 
-                if (otherSettlement.x, otherSettlement.y) == (self.entity.tile.x, self.entity.tile.y):
+            for otherSettlement in GetActiveTiles(world, "economy"):
+                if otherSettlement is src_tile:
                     # it current tile, so skip it
                     continue
 
-                LogEntityEvent(
-                    self.entity,
-                    "DIPLOMACY",
-                    f"Broadcast help to other settlement.",
-                    target_entity=otherSettlement
-                )
-
                 for ent in otherSettlement.entities:
-                    d = ent.get("diplomacy")
-
                     # Directly inject it on short memory of other settlement
                     mem = ent.get("memory")
                     if mem:
-                        mem.remember(f"aid_request_from_{self.entity.id}", {
-                            "from": (self.entity.tile.x, self.entity.tile.y),
-                            "reason": reason
-                        }, long_term=False)
-
-                        LogEntityEvent(
-                            self.entity,
-                            "DIPLOMACY",
-                            f"Checking memory if there are aid requests. {mem.short}",
-                            target_entity=partner
-                        )
+                        mem.remember_aid_request(from_id, request)
+                        recipients += 1
+
+            LogEntityEvent(
+                self.entity,
+                "DIPLOMACY",
+                f"Broadcast help to {recipients} other settlement(s).",
+                target_entity=partner
+            )
             return True
 
         # notify partner by writing into its tile memory (if present)
@@ -206,8 +208,11 @@ class DiplomacyComponent(Component):
         self.relations[target_id] = self.relations.get(target_id, 0.0) + delta
 
     def update(self, world):
-        # Periodically spread rumors. A random chance is used as a stand-in for a timed event.
-        if random.random() < 0.1:  # ~10% chance to spread a rumor per update tick
+        # Periodically spread rumors: same ~10% per-update rate as a random roll,
+        # but the draw happens once per rumor instead of every update.
+        self.rumor_countdown -= 1
+        if self.rumor_countdown <= 0:
+            self.rumor_countdown = _rumor_interval()
             self.spread_rumor(world)
         # nothing here — diplomacy is invoked by AI logic
         pass
@@ -18,64 +18,77 @@ EMOTION_ANCHORS = {
     "Interest/Ambivalence": (0.0, 0.4, 0.0),
 }
 
+# (label, v, a, s) rows for the nearest-anchor scan in get_current_label,
+# flattened once at import so the scan does no dict/tuple indirection
+ANCHOR_TABLE = tuple((label, *vas) for label, vas in EMOTION_ANCHORS.items())
+
 
 class EmotionComponent(Component):
+    __slots__ = ("v", "a", "s", "_decay_rate", "_retain", "stacking_factor")
+
     def __init__(self, v=0.0, a=0.0, s=0.0, decay_rate=0.02, stacking_factor=0.01):
         super().__init__("emotion")
         # VAS Dimensions: V [-1,1], A [0,1], S [-1,1]
         self.v = v
-        self.a = arousal = a
+        self.a = a
         self.s = s
         self.decay_rate = decay_rate
         # k factor (0.05 - 0.2) as per VAS docs
         self.stacking_factor = stacking_factor
 
+    @property
+    def decay_rate(self):
+        return self._decay_rate
+
+    @decay_rate.setter
+    def decay_rate(self, rate):
+        # update() multiplies by the retained fraction, so derive it once here
+        self._decay_rate = rate
+        self._retain = 1.0 - rate
+
     def apply_impulse(self, dv, da, ds):
         """Applies an emotional shift and clamps values to their physical bounds."""
         k = self.stacking_factor
 
-        # Calculate new values with stacking
-        self.v = (self.v + dv) + (k * self.v)
-        self.a = (self.a + da) + (k * self.a)
-        self.s = (self.s + ds) + (k * self.s)
-
-        # Then apply stacking (growth based on current state)
-        # but only if the impulse is pushing in the same direction
-        if (dv > 0 and self.v > 0) or (dv < 0 and self.v < 0):
-            self.v += self.stacking_factor * self.v
-
-        if (da > 0 and self.a > 0) or (da < 0 and self.a < 0):
-            self.a += self.stacking_factor * self.a
-
-        if (ds > 0 and self.s > 0) or (ds < 0 and self.s < 0):
-            self.s += self.stacking_factor * self.s
+        # Apply the impulse, then stacking (growth based on current state)
+        # only if the impulse is pushing in the same direction (same sign).
+        v = self.v + dv
+        if dv * v > 0:
+            v += k * v
+        a = self.a + da
+        if da * a > 0:
+            a += k * a
+        s = self.s + ds
+        if ds * s > 0:
+            s += k * s
 
         # Physical bounds clamping
-        self.v = max(-1.0, min(1.0, self.v))
-        self.a = max(0.0, min(1.0, self.a))
-        self.s = max(-1.0, min(1.0, self.s))
+        self.v = -1.0 if v < -1.0 else (1.0 if v > 1.0 else v)
+        self.a = 0.0 if a < 0.0 else (1.0 if a > 1.0 else a)
+        self.s = -1.0 if s < -1.0 else (1.0 if s > 1.0 else s)
 
     def get_current_label(self):
         """Uses the RBF competition logic to find the dominant emotion label."""
-        agent_point = (self.v, self.a, self.s)
+        # The Gaussian RBF exp(-d^2 / (2 * sigma^2)) is monotone in the squared
+        # distance, so the strongest activation is simply the nearest anchor.
+        v, a, s = self.v, self.a, self.s
         best_label = "Calmness/Apathy"
-        max_activation = -1.0
-        sigma = 0.35
-
-        for label, anchor in EMOTION_ANCHORS.items():
-            # Euclidean distance calculation
-            dist = math.sqrt(sum((a - b) ** 2 for a, b in zip(agent_point, anchor)))
-            # Gaussian RBF activation
-            activation = math.exp(-(dist ** 2) / (2 * sigma ** 2))
+        best_d2 = math.inf
 
-            if activation > max_activation:
-                max_activation = activation
+        for label, av, aa, as_ in ANCHOR_TABLE:
+            dv = v - av
+            da = a - aa
+            ds = s - as_
+            d2 = dv * dv + da * da + ds * ds
+            if d2 < best_d2:
+                best_d2 = d2
                 best_label = label
 
         return best_label
 
     def update(self, world):
         """Natural decay towards the neutral baseline (0,0,0)."""
-        self.v *= (1.0 - self.decay_rate)
-        self.a *= (1.0 - self.decay_rate)
-        self.s *= (1.0 - self.decay_rate)
\ No newline at end of file
+        retain = self._retain
+        self.v *= retain
+        self.a *= retain
+        self.s *= retain
\ No newline at end of file
@@ -1,14 +1,16 @@
 # entities/components/goals.py
 
+from collections import deque
 from ..component import Component
 
 class GoalComponent(Component):
     def __init__(self):
         super().__init__("goals")
-        self.goals = []
+        # FIFO queue: push to the back, pop from the front in O(1)
+        self.goals = deque()
 
     def push(self, goal):
         self.goals.append(goal)
 
     def pop(self):
-        return self.goals.pop(0) if self.goals else None
+        return self.goals.popleft() if self.goals else None
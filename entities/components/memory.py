@@ -1,29 +1,60 @@
 # entities/components/memory.py
 from ..component import Component
-from collections import deque
+from array import array
+import heapq
+
+# short-term memories last this many updates
+SHORT_TERM_TTL = 2
 
 class MemoryComponent(Component):
     def __init__(self, max_len=30):
         super().__init__("memory")
-        # short-term ephemeral memory
+        # short-term ephemeral memory: key -> (value, expiry update count)
         self.short = {}
+        # (expiry, key) min-heap so update only touches entries that are due
+        self._expiry_heap = []
+        self._updates = 0
+        # pending aid requests: sender entity id -> (request, expiry decision tick).
+        # Kept apart from `short` so responders read just these, not every memory.
+        # They age in the owner's decision ticks (expire_aid_requests), not in
+        # memory updates, so a throttled settlement AI still gets to see each one.
+        self.aid_requests = {}
+        self._aid_ticks = 0
         # long-term entries such as relations or persistent notices
         self.long = {}
-        # rolling economy history for trend detection
+        # rolling economy history for trend detection: fixed-size ring buffers
+        # sharing one write index (record_econ always writes all three keys).
+        # Typed arrays hold raw 8-byte values, so writes don't box a new object.
         self.econ_history = {
-            "supplies": deque(maxlen=max_len),
-            "wealth": deque(maxlen=max_len),
-            "population": deque(maxlen=max_len)
+            "supplies": array("d", [0.0]) * max_len,
+            "wealth": array("d", [0.0]) * max_len,
+            "population": array("q", [0]) * max_len
         }
         self.max_len = max_len
-
-    # convenience - snapshot current econ into history
-    def record_econ(self, econ):
-        if not econ:
-            return
-        self.econ_history["supplies"].append(float(econ.get("supplies", 0)))
-        self.econ_history["wealth"].append(float(econ.get("wealth", 0)))
-        self.econ_history["population"].append(int(econ.get("population", 0)))
+        self._hist_idx = 0  # next slot to write
+        self._hist_len = 0  # number of valid samples (<= max_len)
+        # (key, lookback, thresh_pct) -> trend label; valid until the next record_econ
+        self._trend_cache = {}
+
+    # convenience - snapshot current econ values into history
+    def record_econ(self, supplies, wealth, population):
+        hist = self.econ_history
+        i = self._hist_idx
+        hist["supplies"][i] = supplies
+        hist["wealth"][i] = wealth
+        hist["population"][i] = int(population)  # economies can carry a float population
+        self._hist_idx = (i + 1) % self.max_len
+        if self._hist_len < self.max_len:
+            self._hist_len += 1
+        self._trend_cache.clear()
+
+    def _window_sum(self, buf, start, count):
+        """Sum count samples of a ring buffer from start, oldest first (same order as a flat list)."""
+        start %= self.max_len
+        end = start + count
+        if end <= self.max_len:
+            return sum(buf[start:end])
+        return sum(buf[:end - self.max_len], sum(buf[start:]))
 
     def detect_trend(self, key="supplies", lookback=6, thresh_pct=0.05):
         """
@@ -31,16 +62,23 @@ class MemoryComponent(Component):
           - Returns "improving" / "declining" / "stable"
           - Compares average of last lookback values to previous lookback values.
         """
-        arr = list(self.econ_history.get(key, []))
-        n = len(arr)
-        if n < lookback * 2:
+        # The trend can only change on record_econ, which clears this cache, so
+        # repeated queries between records are a single dict lookup
+        cache_key = (key, lookback, thresh_pct)
+        trend = self._trend_cache.get(cache_key)
+        if trend is None:
+            trend = self._trend_cache[cache_key] = self._compute_trend(key, lookback, thresh_pct)
+        return trend
+
+    def _compute_trend(self, key, lookback, thresh_pct):
+        buf = self.econ_history.get(key)
+        if buf is None or lookback <= 0 or self._hist_len < lookback * 2:
             return "stable"
 
-        recent = arr[-lookback:]
-        prev = arr[-lookback*2:-lookback]
-
-        avg_recent = sum(recent) / len(recent)
-        avg_prev = sum(prev) / len(prev) if prev else avg_recent
+        # Sum the two windows straight out of the ring, no list copy
+        end = self._hist_idx
+        avg_recent = self._window_sum(buf, end - lookback, lookback) / lookback
+        avg_prev = self._window_sum(buf, end - lookback * 2, lookback) / lookback
 
         if avg_prev == 0:
             return "stable"
@@ -57,8 +95,26 @@ class MemoryComponent(Component):
         if long_term:
             self.long[key] = value
         else:
-            # TTL = 2 ticks
-            self.short[key] = (value, 2)
+            expiry = self._updates + SHORT_TERM_TTL
+            self.short[key] = (value, expiry)
+            heapq.heappush(self._expiry_heap, (expiry, key))
+
+    def remember_aid_request(self, from_id, request):
+        """Store an aid request from another settlement; it lasts SHORT_TERM_TTL decision ticks."""
+        self.aid_requests[from_id] = (request, self._aid_ticks + SHORT_TERM_TTL)
+
+    def expire_aid_requests(self):
+        """
+        Advance the aid-request clock by one decision tick and drop requests
+        whose TTL ran out. Called by the owner's AI right before it decides.
+        """
+        self._aid_ticks += 1
+        now = self._aid_ticks
+        pending = self.aid_requests
+        if pending:
+            # aid requests are few, so a direct sweep is cheaper than heap bookkeeping
+            for from_id in [k for k, (_, expiry) in pending.items() if expiry <= now]:
+                del pending[from_id]
 
     def recall(self, key, default=None):
         if key in self.short:
@@ -108,16 +164,15 @@ class MemoryComponent(Component):
         return False  # Old key not found
 
     def update(self, world):
-        # Decrement TTL
-        expired = []
-        for key, (value, ttl) in self.short.items():
-            ttl -= 1
-            if ttl <= 0:
-                expired.append(key)
-            else:
-                self.short[key] = (value, ttl)
-
-        # Remove expired keys
-        for key in expired:
-            del self.short[key]
-
+        # Expire short-term entries whose TTL ran out this update. Entries that
+        # were re-remembered (newer expiry) or deleted leave stale heap items,
+        # which are dropped here without touching the dict.
+        self._updates += 1
+        now = self._updates
+        heap = self._expiry_heap
+        short = self.short
+        while heap and heap[0][0] <= now:
+            expiry, key = heapq.heappop(heap)
+            entry = short.get(key)
+            if entry is not None and entry[1] == expiry:
+                del short[key]
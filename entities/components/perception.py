@@ -2,9 +2,12 @@
 
 from ..component import Component
 from world_utils import GetTilesWithinRadius, GetActiveTiles
+import world_index_store
 
 
 class PerceptionComponent(Component):
+    __slots__ = ("radius", "blackboard")
+
     def __init__(self, radius=3):
         super().__init__("perception")
         self.radius = radius
@@ -14,7 +17,7 @@ class PerceptionComponent(Component):
             "i_raw": 0.0,  # Perceived Intent [-1, 1]
             "u": 0.0,  # Uncertainty [0, 1]
             "neighbors": [],
-            "tags": []
+            "tags": frozenset()
         }
 
     def update(self, world):
@@ -39,26 +42,36 @@ class PerceptionComponent(Component):
                 u = 0.2
 
         # 2. Interpret Social Threats (Neighbors)
-        for n in neighbors:
-            if n.has_tag("bandit_settlement"):
-                sv = max(sv, 0.6)
-                i_raw = min(i_raw, -0.7)  # Clear negative intent
-                u = max(u, 0.4)  # Threat increases anxiety/uncertainty
+        # Every settlement scans the same neighbor list and max/min don't care
+        # about order, so only "is any neighbor tagged" matters. The world index
+        # answers that from its tag sets; otherwise scan with early exit.
+        widx = world_index_store.world_index
+        if widx:
+            bandits = widx.has_tag_with_system("bandit_settlement", "economy")
+            predators = widx.has_tag_with_system("predator_surge", "economy")
+        else:
+            bandits = any("bandit_settlement" in n.tag_set for n in neighbors)
+            predators = any("predator_surge" in n.tag_set for n in neighbors)
+
+        if bandits:
+            sv = max(sv, 0.6)
+            i_raw = min(i_raw, -0.7)  # Clear negative intent
+            u = max(u, 0.4)  # Threat increases anxiety/uncertainty
 
-            if n.has_tag("predator_surge"):
-                sv = max(sv, 0.8)
-                i_raw = min(i_raw, -0.5)
-                u = max(u, 0.6)
+        if predators:
+            sv = max(sv, 0.8)
+            i_raw = min(i_raw, -0.5)
+            u = max(u, 0.6)
 
         # 3. Interpret Local Tags
         if t.has_tag("hungry") or t.has_tag("water_crisis"):
             sv = max(sv, 0.5)
             u = max(u, 0.3)
 
-        self.blackboard.update({
-            "sv": sv,
-            "i_raw": i_raw,
-            "u": u,
-            "neighbors": neighbors,
-            "tags": list(t.tags)
-        })
\ No newline at end of file
+        # write into the preallocated blackboard keys (no temporary dict)
+        bb = self.blackboard
+        bb["sv"] = sv
+        bb["i_raw"] = i_raw
+        bb["u"] = u
+        bb["neighbors"] = neighbors
+        bb["tags"] = t.tag_set  # tile's cached frozenset; only rebuilt when its tags change
\ No newline at end of file
@@ -7,6 +7,8 @@ class PersonalityComponent(Component):
     Stores stable personality traits that bias emotional interpretation
     and responses according to the VAS formal model.
     """
+    __slots__ = ("traits",)
+
     def __init__(self, traits=None):
         super().__init__("personality")
         # Default traits aligned with VAS Model Section 3 (docs/VAS.pdf)
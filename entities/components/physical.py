@@ -4,6 +4,10 @@ from ..component import Component
 from world_utils import LogEntityEvent
 import json
 
+# Per-step payload trail logging ("Payload arrived on (x, y) ..."). Very chatty:
+# one line per payload per move, so it is off unless debugging payload routes.
+DEBUG_PAYLOAD = False
+
 class PhysicalComponent(Component):
     def __init__(self):
         super().__init__("physical")
@@ -17,33 +21,30 @@ class PhysicalComponent(Component):
         # Payload movement
         tile = self.path.pop(0)
 
-        # Remove from old tile payloads
+        # Remove from old tile payloads (a set: O(1) discard)
         prev_tile = getattr(self.entity, "tile", None)
         if prev_tile and hasattr(prev_tile, "payloads"):
-            if self.entity in prev_tile.payloads:
-                prev_tile.payloads.remove(self.entity)
+            prev_tile.payloads.discard(self.entity)
 
         # Move entity
         self.entity.tile = tile
 
-        # Add to new tile payloads list
+        # Add to new tile payloads set
         if not hasattr(tile, "payloads"):
-            tile.payloads = []
-        tile.payloads.append(self.entity)
+            tile.payloads = set()
+        tile.payloads.add(self.entity)
 
         # PAYLOAD ARRIVAL CHECK
         payload_comp = self.entity.components.get("payload")
         if payload_comp:
             # Flavor trail
-            try:
+            if DEBUG_PAYLOAD:
                 LogEntityEvent(
                     tile,
                     "PAYLOAD",
                     f"Payload arrived on ({tile.x}, {tile.y}) with destination of {payload_comp.destination}. Payload content: {payload_comp.payload_data}",
                 )
                 # tile.add_tag("caravan_was_here")
-            except:
-                pass
 
             # Destination check
             if (tile.x, tile.y) == payload_comp.destination:
@@ -1,6 +1,7 @@
 # entities/components/relationship.py
 
 from ..component import Component
+from array import array
 
 
 class RelationshipComponent(Component):
@@ -13,29 +14,53 @@ class RelationshipComponent(Component):
 
     def __init__(self):
         super().__init__("relationship")
-        # key: entity_id -> {'rv': float, 'rs': float}
-        self.table = {}
+        # key: entity_id -> slot in the parallel rv / rs arrays
+        self.slots = {}
+        self.rv = array("d")
+        self.rs = array("d")
+
+    @property
+    def table(self):
+        """Snapshot as {entity_id: {'rv': float, 'rs': float}} (read-only view for export)."""
+        rv, rs = self.rv, self.rs
+        return {other_id: {"rv": rv[i], "rs": rs[i]} for other_id, i in self.slots.items()}
+
+    def _slot(self, other_id):
+        """Slot for other_id, appending a neutral (0, 0) relationship if it is new."""
+        i = self.slots.get(other_id)
+        if i is None:
+            i = self.slots[other_id] = len(self.rv)
+            self.rv.append(0.0)
+            self.rs.append(0.0)
+        return i
 
     def initialize(self, self_entity, all_entities):
         """Initializes baseline relationships based on settlement types."""
-        econ = self_entity.tile.get_system("economy")
-        my_types = set(econ.get("settlement_type", []))
+        # Shared types = popcount of the two settlements' type bitmasks.
+        # (economy imports the settlement factory, so resolve it lazily)
+        from economy import get_settlement_type_mask
+
+        def type_mask(econ):
+            mask = econ.get("type_mask")
+            if mask is None:
+                mask = get_settlement_type_mask(econ.get("settlement_type", []))
+            return mask
+
+        my_mask = type_mask(self_entity.tile.get_system("economy"))
+        my_id = self_entity.id
+        rv, rs = self.rv, self.rs
 
         for other in all_entities:
-            if other.id == self_entity.id:
+            if other.id == my_id:
                 continue
 
-            other_econ = other.tile.get_system("economy")
-            other_types = set(other_econ.get("settlement_type", []))
-
-            shared = my_types.intersection(other_types)
+            shared = (my_mask & type_mask(other.tile.get_system("economy"))).bit_count()
             # Map shared interests to a starting positive valence [0.0 to 1.0]
-            base_rv = min(1.0, len(shared) * 0.1)
+            base_rv = min(1.0, shared * 0.1)
 
-            self.table[other.id] = {
-                "rv": base_rv,
-                "rs": 0.0  # Sociality starts neutral
-            }
+            i = self._slot(other.id)
+            rv[i] = base_rv
+            rs[i] = 0.0  # Sociality starts neutral
 
     def update_relationship(self, other_id, current_v, current_s):
         """
@@ -43,24 +68,40 @@ class RelationshipComponent(Component):
         Rv' = 0.9 * Rv + 0.1 * V
         Rs' = 0.9 * Rs + 0.1 * S
         """
-        rel = self.table.get(other_id, {"rv": 0.0, "rs": 0.0})
+        self.update_relationships(((other_id, current_v, current_s),))
 
-        rel["rv"] = (0.9 * rel["rv"]) + (0.1 * current_v)
-        rel["rs"] = (0.9 * rel["rs"]) + (0.1 * current_s)
+    def update_relationships(self, updates):
+        """
+        Batched EMA update: applies update_relationship to every
+        (other_id, current_v, current_s) in one pass over the table.
+        Entries are updated in place; unknown ids start from a neutral baseline.
+        """
+        rv_arr, rs_arr, slots = self.rv, self.rs, self.slots
+        for other_id, current_v, current_s in updates:
+            i = slots.get(other_id)
+            if i is None:
+                i = self._slot(other_id)
 
-        # Clamp to ensure numerical stability within [-1, 1]
-        rel["rv"] = max(-1.0, min(1.0, rel["rv"]))
-        rel["rs"] = max(-1.0, min(1.0, rel["rs"]))
+            rv = (0.9 * rv_arr[i]) + (0.1 * current_v)
+            rs = (0.9 * rs_arr[i]) + (0.1 * current_s)
 
-        self.table[other_id] = rel
+            # Clamp to ensure numerical stability within [-1, 1]
+            rv_arr[i] = -1.0 if rv < -1.0 else (1.0 if rv > 1.0 else rv)
+            rs_arr[i] = -1.0 if rs < -1.0 else (1.0 if rs > 1.0 else rs)
 
     def get_rv(self, other_id):
         """Returns the long-term relationship valence baseline."""
-        return self.table.get(other_id, {"rv": 0.0})["rv"]
+        i = self.slots.get(other_id)
+        return self.rv[i] if i is not None else 0.0
 
     def get_rs(self, other_id):
         """Returns the long-term sociality memory."""
-        return self.table.get(other_id, {"rs": 0.0})["rs"]
+        i = self.slots.get(other_id)
+        return self.rs[i] if i is not None else 0.0
+
+    def has_rivalry(self, rv_below=-0.5, rs_below=-0.5):
+        """True if any relationship is below both thresholds (strong rivalry)."""
+        return any(rv < rv_below and rs < rs_below for rv, rs in zip(self.rv, self.rs))
 
     def to_json(self):
         return self.table
\ No newline at end of file
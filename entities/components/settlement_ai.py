@@ -5,385 +5,614 @@ from world_utils import GetTilesWithinRadius, GetNearestTileWithSystem, LogEntit
 import behavior as bh  # your behavior.py (Node, Sequence, Selector, Status)
 import world_index_store
 
+# Per-tick diagnostics (emotion state and raid drive of every settlement on
+# every AI tick, and the emergency-shortage notice that repeats on every tick
+# a settlement stays short). Very chatty, so they are off unless tuning
+# settlement AI.
+DEBUG_SETTLEMENT_AI = False
+
+
+# --- Settlement behavior tree nodes ---------------------------------------
+# One tree is shared by every settlement. Nodes hold no per-entity state; they
+# read the settlement being ticked from a SettlementBTContext: the AIComponent
+# points it at its entity and SettlementAIComponent.update at its economy.
+
+class SettlementBTContext:
+    __slots__ = ("entity", "econ", "supply_trend", "supply_trend_entity")
 
-class SettlementAIComponent(Component):
     def __init__(self):
-        super().__init__("settlement_ai")
-        self._bt_built = False
+        self.entity = None
+        # the ticked settlement's economy dict, fetched once per tick by
+        # SettlementAIComponent.update instead of by every node
+        self.econ = None
+        # supplies trend computed by CheckSupplyCrisis for supply_trend_entity,
+        # reused by HandleSupplyAction in the same sequence
+        self.supply_trend = None
+        self.supply_trend_entity = None
 
-    def _build_behavior_tree(self):
-        """
-        Build a compact BT capturing:
-          - defend_if_threat (bandits nearby)
-          - handle_supply_crisis (increase supplies / request aid)
-          - celebrate_if_prosperous (festival)
-          - idle (do maintenance)
-        Nodes are closures that reference self.entity
-        """
-        entity = self.entity
 
-        class CheckThreat(bh.Node):
-            def tick(self):
-                # Now uses the unified perception blackboard
-                perc = entity.get("perception")
-                if not perc: return bh.Status.FAILURE
-
-                # Check for high sensory intensity (SV) or negative intent (I_raw)
-                # indicating a perceived threat
-                if perc.blackboard.get("sv", 0) > 0.6 or perc.blackboard.get("i_raw", 0) < -0.4:
-                    return bh.Status.SUCCESS
-                return bh.Status.FAILURE
-
-        class DefendAction(bh.Node):
-            def tick(self):
-                # Uses unified emotion impulse system
-                emo = entity.get("emotion")
-                if emo:
-                    # High uncertainty and sensory impact increase arousal
-                    emo.apply_impulse(dv=-0.2, da=0.4, ds=-0.3)
-                entity.tile.add_tag("under_threat")
-                return bh.Status.SUCCESS
+def _perceives_threat(blackboard):
+    """High sensory intensity (SV) or negative intent (I_raw) indicating a perceived threat."""
+    return blackboard.get("sv", 0) > 0.6 or blackboard.get("i_raw", 0) < -0.4
 
-        class CheckSupplyCrisis(bh.Node):
-            def tick(self):
-                econ = entity.tile.get_system("economy")
-                if not econ:
-                    return bh.Status.FAILURE
-                mem = entity.get("memory")
-                mem.record_econ(econ)
-                # use memory trend detection
-                trend = mem.detect_trend("supplies")
-                # crisis if immediate supplies below threshold OR trend declining
-                if econ["supplies"] < econ["population"] * 0.6 or trend == "declining":
-                    return bh.Status.SUCCESS
-                return bh.Status.FAILURE
-
-        class HandleSupplyAction(bh.Node):
-            def tick(self):
-                action = entity.get("action")
-                dip = entity.get("diplomacy")
-                mem = entity.get("memory")
-                econ = entity.tile.get_system("economy")
-
-                # If we have a local partner that recently asked, try to trade/ask
-                # If supplies extremely low, request aid; else try small internal increase
-
-                # if econ["supplies"] < 2:
-                #     action.trigger_event("trade_mission")
-
-                # if econ["supplies"] < econ["population"] * 0.4:
-                if econ["supplies"] < 2:
-                    LogEntityEvent(entity, "DIPLOMACY", "Emergency shortage triggered.")
-
-                    # emergency: request aid from nearest partner
-                    if dip:
-                        dip.request_aid(entity.tile.index.world if getattr(entity.tile, "index", None) else None,
-                                        reason="emergency_shortage")
-                    # if action:
-                    #     action.increase_supplies(amount=5)
-                    return bh.Status.SUCCESS
-
-                # If trend declining, attempt trade mission (uses event system)
-                trend = mem.detect_trend("supplies")
-                if trend == "declining":
-                    if action:
-                        action.trigger_event("trade_mission")
-                    return bh.Status.SUCCESS
-
-                # fallback small harvest push
-                if action:
-                    action.trigger_event("do_nothing")
-                    # action.add_supplies(1)
-                return bh.Status.SUCCESS
 
-        class CheckProsperity(bh.Node):
-            def tick(self):
-                econ = entity.tile.get_system("economy")
-                if not econ:
-                    return bh.Status.FAILURE
-                if econ.get("wealth", 0) > 110:
-                    return bh.Status.SUCCESS
-                return bh.Status.FAILURE
-
-        class CelebrateAction(bh.Node):
-            def tick(self):
-                # boost pride & trigger festival
-                emo = entity.get("emotion")
-                action = entity.get("action")
-                if emo:
-                    emo.apply_impulse(0.01, 0, 0)
-                if action:
-                    action.trigger_event("do_nothing")
-                    # action.trigger_event("festival")
-                return bh.Status.SUCCESS
+class CheckThreat(bh.Node):
+    __slots__ = ("ctx",)
 
-        class Idle(bh.Node):
-            def tick(self):
-                # maintenance: read memory, maybe adjust sub-commodities slowly
-                econ = entity.tile.get_system("economy")
-                subs = econ.get("sub_commodities", {}) if econ else {}
-                # small passive adjustment
-                for k in subs:
-                    subs[k] = max(0.0, subs[k] * 0.999)
-                return bh.Status.SUCCESS
+    def __init__(self, ctx):
+        self.ctx = ctx
 
-        class CheckAndExecuteRaid(bh.Node):
-            def tick(self):
-                # 1. Check Self-Tendency: Only act if raid drive exceed threshold
-                tend = entity.get("tendency")
-                econ = entity.tile.get_system("economy")
-
-                # --- 1.1 Compute raid inclination ---
-                raid_drive = (
-                        tend.get("aggression") * 0.4 +
-                        tend.get("risk") * 0.3 +
-                        (-tend.get("social")) * 0.2 +
-                        (-tend.get("authority")) * 0.1
-                )
-
-                # --- 1.2 Contextual pressure modifiers ---
-                if econ and econ.get("supplies", 0) < econ.get("population", 1) * 0.6:
-                   raid_drive += 0.2  # desperation boost
-
-                LogEntityEvent(
-                    entity,
-                    "AI:RAID DECISION",
-                    f"drive={raid_drive:.2f} "
-                    f"(agg={tend.get('aggression'):.2f}, "
-                    f"risk={tend.get('risk'):.2f}, "
-                    f"social={tend.get('social'):.2f}, "
-                    f"auth={tend.get('authority'):.2f})"
-                )
-
-                # --- 1.3 Threshold check (soft) ---
-                if raid_drive < 0.4:
-                   return bh.Status.FAILURE
-
-                LogEntityEvent(
-                    entity.tile,
-                    "AI",
-                    f"Triggering raid action.",
-                )
-
-                # 2. Find Target: Look for nearby vulnerable settlements
-                target_tile = None
-
-                # Check neighbors within radius=5 (from PerceptionComponent init)
-                for n_tile in entity.get("perception").blackboard.get("neighbors", []):
-                    econ = n_tile.get_system("economy")
-                    if not econ or n_tile is entity.tile:
-                        continue
-
-                    # Vulnerable Target: Wealthy AND Struggling
-                    if n_tile.has_tag("wealthy") and n_tile.has_tag("struggling"):
-                        target_tile = n_tile
-                        break
-
-                if target_tile:
-                    LogEntityEvent(
-                        entity.tile,
-                        "AI",
-                        f"Found valid raid target.",
-                        target_entity=target_tile
-
-                    )
-
-                    # 3. Trigger Raid Payload
-                    action = entity.get("action")
-                    action.trigger_event("raid")  # Use "raid" which sends the payload
-
-                    # 4. Add Flavor Tag to Self
-                    entity.tile.add_tag("opportunistic_raid")
-
-                    # Store destination for payload system if needed (TriggerEventFromLibrary handles this now)
-                    entity.tile.temp_dest = target_tile
-
-                    LogEntityEvent(entity, "[AI] RAIDS", "Targeting " + target_tile.pos + "(Vulnerable).")
-                    return bh.Status.SUCCESS
-
-                return bh.Status.FAILURE
-
-        class CheckAndExecuteAid(bh.Node):
-            def tick(self):
-                # 1. Uses unified personality traits
-                pers = entity.get("personality")
-                if pers.get("agreeableness") < 0.6:  # Replaces 'cooperative'
-                    return bh.Status.FAILURE
-
-                # 2. Check Self-Resources: Must have a surplus to give aid
-                econ = entity.tile.get_system("economy")
-                # if econ.get("supplies", 0) < econ.get("population", 1) * 1.5:
-                if econ.get("supplies", 0) < 20:
-                    return bh.Status.FAILURE
-
-                # 3. Find Target: Check Memory for aid requests
-                mem = entity.get("memory")
-                aid_request_key = next((k for k in mem.short if k.startswith("aid_request_from_")), None)
-
-                if aid_request_key:
-                    # Target found in memory (via DiplomacyComponent's broadcast)
-                    v = mem.recall(aid_request_key)
-                    coords = v["from"]
-
-                    if coords:
-                        # Find the tile (assumes index is available)
-                        rx, ry = coords
-                        world = entity.tile.index.world
-                        target_tile = world[ry][rx]
-
-                        # 4. Trigger Aid Payload (via DiplomacyComponent)
-                        dip = entity.get("diplomacy")
-                        dip.offer_aid(world, target_tile, amount_supplies=3)
-
-                        # 5. Add Flavor Tag to Self
-                        entity.tile.add_tag("diplomatic_support")
-
-                        LogEntityEvent(entity, "[AI] AID", "Offering aid to " + target_tile.pos + "(Crisis).")
-                        # Clear memory entry after action
-                        del mem.short[aid_request_key]
-                        return bh.Status.SUCCESS
-
-                return bh.Status.FAILURE
-
-        class CheckAmbitiousState(bh.Node):
-            def tick(self):
-                econ = entity.tile.get_system("economy")
-                pers = entity.get("personality")
-                if not econ:
-                    return bh.Status.FAILURE
-
-                # Prosperity Check: Only act when healthy (Supplies are NOT in crisis)
-                is_stable = econ["supplies"] > econ["population"] * 0.8
-
-                # Dominance Check: Is the trait score above threshold?
-                is_dominant = pers.get("dominance") > 0.6
-
-                # Wealth Check: Only invest ambition if there's wealth to risk
-                is_wealthy = econ.get("wealth", 0) > 150
-
-                if is_stable and is_dominant and is_wealthy:
-                    return bh.Status.SUCCESS
-                return bh.Status.FAILURE
-
-        # 📌 NEW NODE 2: Execute ambitious action (Raid or Hoard)
-        class HandleAmbitiousAction(bh.Node):
-            def tick(self):
-                action = entity.get("action")
-                pers = entity.get("personality")
-
-                # If Aggressive, ambition manifests as expansion/raid
-                if pers.get("novelty") > 0.7 and pers.get("agreeableness") < 0.3:
-                    # Trigger opportunistic raid event (seeks vulnerable target)
-                    action.trigger_event("raid")
-                    entity.tile.add_tag("seeking_dominance")
-
-                    LogEntityEvent(entity, "[AI] AMBITION", "Triggered RAID for expansion.")
-
-                # If Cautious/Greedy, ambition manifests as hoarding wealth
-                else:
-                    # Schedule a financial event to grow wealth long-term
-                    from tile_events import ScheduleTileEvent
-                    ScheduleTileEvent(entity.tile, "market_boom",
-                                      start_tick=entity.tile.get_system("economy").get("id", 0) % 5 + 1)
-                    entity.tile.add_tag("hoarding_wealth")
-                    LogEntityEvent(entity, "[AI] AMBITION", "Triggered Market Boom for hoarding.")
+    def tick(self):
+        entity = self.ctx.entity
+        # Now uses the unified perception blackboard
+        perc = entity.get("perception")
+        if not perc: return bh.Status.FAILURE
 
-                return bh.Status.SUCCESS
+        if _perceives_threat(perc.blackboard):
+            return bh.Status.SUCCESS
+        return bh.Status.FAILURE
 
-        # --- NEW BORDER EXPANSION / TILE CLAIMING LOGIC (Priority 7) ---
 
-        CLAIM_COST = 5.0  # Power projection cost to establish a claim
-        CLAIM_SUPPLIES_THRESHOLD = 0.8  # Must have supplies > 80% of population
-        CLAIM_RANGE = 3  # Search radius for unclaimed tiles
+class DefendAction(bh.Node):
+    __slots__ = ("ctx",)
 
-        class CheckCanClaimTile(bh.Node):
-            def tick(self):
-                econ = entity.tile.get_system("economy")
+    def __init__(self, ctx):
+        self.ctx = ctx
 
-                if not econ:
-                    return bh.Status.FAILURE
+    def tick(self):
+        entity = self.ctx.entity
+        # Uses unified emotion impulse system
+        emo = entity.get("emotion")
+        if emo:
+            # High uncertainty and sensory impact increase arousal
+            emo.apply_impulse(dv=-0.2, da=0.4, ds=-0.3)
+        entity.tile.add_tag("under_threat")
+        return bh.Status.SUCCESS
 
-                # 1. Check Resources & Stability
-                power_proj = econ.get("power_projection", 0)
-                is_stable = econ["supplies"] > econ["population"] * CLAIM_SUPPLIES_THRESHOLD
 
-                if power_proj < CLAIM_COST or not is_stable:
-                    return bh.Status.FAILURE
+class CheckSupplyCrisis(bh.Node):
+    __slots__ = ("ctx",)
 
-                # 2. Find Target: Look for nearby unclaimed tiles
-                target_tile = None
+    def __init__(self, ctx):
+        self.ctx = ctx
 
-                # Use a specific scan for tiles within the claim radius
-                world = entity.tile.index.world if getattr(entity.tile, "index", None) else None
-                if not world:
-                    return bh.Status.FAILURE
+    def tick(self):
+        entity = self.ctx.entity
+        econ = self.ctx.econ
+        if not econ:
+            return bh.Status.FAILURE
+        ctx = self.ctx
+        # crisis if immediate supplies below threshold OR trend declining.
+        # The threshold is a single comparison, so test it first and only run
+        # trend detection when it doesn't already decide the outcome.
+        if econ["supplies"] < econ["population"] * 0.6:
+            ctx.supply_trend_entity = None  # trend not computed this tick
+            return bh.Status.SUCCESS
+        # SettlementAIComponent.update already recorded this tick's econ values
+        # use memory trend detection
+        trend = entity.get("memory").detect_trend("supplies")
+        ctx.supply_trend = trend
+        ctx.supply_trend_entity = entity
+        if trend == "declining":
+            return bh.Status.SUCCESS
+        return bh.Status.FAILURE
+
+
+class HandleSupplyAction(bh.Node):
+    __slots__ = ("ctx",)
+
+    def __init__(self, ctx):
+        self.ctx = ctx
+
+    def tick(self):
+        entity = self.ctx.entity
+        action = entity.get("action")
+        dip = entity.get("diplomacy")
+        mem = entity.get("memory")
+        econ = self.ctx.econ
+
+        # If we have a local partner that recently asked, try to trade/ask
+        # If supplies extremely low, request aid; else try small internal increase
+
+        # if econ["supplies"] < 2:
+        #     action.trigger_event("trade_mission")
+
+        # if econ["supplies"] < econ["population"] * 0.4:
+        if econ["supplies"] < 2:
+            if DEBUG_SETTLEMENT_AI:
+                LogEntityEvent(entity, "DIPLOMACY", "Emergency shortage triggered.")
+
+            # emergency: request aid from nearest partner
+            if dip:
+                dip.request_aid(entity.tile.index.world if getattr(entity.tile, "index", None) else None,
+                                reason="emergency_shortage")
+            # if action:
+            #     action.increase_supplies(amount=5)
+            return bh.Status.SUCCESS
+
+        # If trend declining, attempt trade mission (uses event system)
+        ctx = self.ctx
+        if ctx.supply_trend_entity is entity:
+            trend = ctx.supply_trend  # just computed by CheckSupplyCrisis
+        else:
+            trend = mem.detect_trend("supplies")
+        if trend == "declining":
+            if action:
+                action.trigger_event("trade_mission")
+            return bh.Status.SUCCESS
+
+        # fallback small harvest push
+        if action:
+            action.trigger_event("do_nothing")
+            # action.add_supplies(1)
+        return bh.Status.SUCCESS
 
-                # Note: This relies on GetTilesWithinRadius being available
-                for n_tile in GetTilesWithinRadius(world, entity.tile.x, entity.tile.y, radius=CLAIM_RANGE):
-                    # Check if tile is valid (not self, not water/mountain)
-                    if n_tile is entity.tile or n_tile.terrain in ["water", "mountain"]:
-                        continue
 
-                    claim_system = n_tile.get_system("claim")
-                    if claim_system:
-                        # Skip if already claimed
-                        continue
+class CheckProsperity(bh.Node):
+    __slots__ = ("ctx",)
 
-                    # Target found! (Simple rule: claim the first available neutral tile)
+    def __init__(self, ctx):
+        self.ctx = ctx
+
+    def tick(self):
+        entity = self.ctx.entity
+        econ = self.ctx.econ
+        if not econ:
+            return bh.Status.FAILURE
+        if econ.get("wealth", 0) > 110:
+            return bh.Status.SUCCESS
+        return bh.Status.FAILURE
+
+
+class CelebrateAction(bh.Node):
+    __slots__ = ("ctx",)
+
+    def __init__(self, ctx):
+        self.ctx = ctx
+
+    def tick(self):
+        entity = self.ctx.entity
+        # boost pride & trigger festival
+        emo = entity.get("emotion")
+        action = entity.get("action")
+        if emo:
+            emo.apply_impulse(0.01, 0, 0)
+        if action:
+            action.trigger_event("do_nothing")
+            # action.trigger_event("festival")
+        return bh.Status.SUCCESS
+
+
+class Idle(bh.Node):
+    __slots__ = ("ctx",)
+
+    def __init__(self, ctx):
+        self.ctx = ctx
+
+    def tick(self):
+        entity = self.ctx.entity
+        # maintenance: read memory, maybe adjust sub-commodities slowly
+        econ = self.ctx.econ
+        subs = econ.get("sub_commodities", {}) if econ else {}
+        # small passive adjustment: decay, clamped at 0 (same as max(0.0, v * 0.999)).
+        # Overwriting existing keys while iterating items() is safe and saves a
+        # lookup plus a max() call per commodity.
+        for k, v in subs.items():
+            subs[k] = v * 0.999 if v > 0.0 else 0.0
+        return bh.Status.SUCCESS
+
+
+AID_MIN_AGREEABLENESS = 0.6  # Replaces 'cooperative'
+
+def raid_drive_from(tend):
+    """Base raid inclination from tendencies, before per-tick pressure modifiers."""
+    return (
+            tend.get("aggression") * 0.4 +
+            tend.get("risk") * 0.3 +
+            (-tend.get("social")) * 0.2 +
+            (-tend.get("authority")) * 0.1
+    )
+
+
+class CheckAndExecuteRaid(bh.Node):
+    __slots__ = ("ctx",)
+
+    def __init__(self, ctx):
+        self.ctx = ctx
+
+    def tick(self):
+        entity = self.ctx.entity
+        # 1. Check Self-Tendency: Only act if raid drive exceed threshold
+        econ = self.ctx.econ
+
+        # --- 1.1 Raid inclination (fixed per settlement, see raid_drive_from) ---
+        raid_drive = entity.get("settlement_ai").raid_drive_base
+
+        # --- 1.2 Contextual pressure modifiers ---
+        if econ and econ.get("supplies", 0) < econ.get("population", 1) * 0.6:
+           raid_drive += 0.2  # desperation boost
+
+        if DEBUG_SETTLEMENT_AI:
+            tend = entity.get("tendency")
+            LogEntityEvent(
+                entity,
+                "AI:RAID DECISION",
+                f"drive={raid_drive:.2f} "
+                f"(agg={tend.get('aggression'):.2f}, "
+                f"risk={tend.get('risk'):.2f}, "
+                f"social={tend.get('social'):.2f}, "
+                f"auth={tend.get('authority'):.2f})"
+            )
+
+        # --- 1.3 Threshold check (soft) ---
+        if raid_drive < 0.4:
+           return bh.Status.FAILURE
+
+        LogEntityEvent(
+            entity.tile,
+            "AI",
+            f"Triggering raid action.",
+        )
+
+        # 2. Find Target: Look for nearby vulnerable settlements
+        target_tile = None
+
+        # Vulnerable Target: Wealthy AND Struggling settlement. With the world
+        # index, intersect its tag sets and take the first candidate in the
+        # neighbors' row-major order; otherwise test each neighbor's tags.
+        widx = world_index_store.world_index
+        if widx:
+            candidates = widx.with_all_tags(("wealthy", "struggling"), "economy")
+            candidates.discard(entity.tile)
+            if candidates:
+                target_tile = min(candidates, key=lambda t: (t.y, t.x))
+        else:
+            # Check neighbors within radius=5 (from PerceptionComponent init)
+            for n_tile in entity.get("perception").blackboard.get("neighbors", []):
+                econ = n_tile.get_system("economy")
+                if not econ or n_tile is entity.tile:
+                    continue
+
+                if n_tile.has_tag("wealthy") and n_tile.has_tag("struggling"):
                     target_tile = n_tile
                     break
 
-                if target_tile:
-                    # Store the target for the action node
-                    entity.tile.temp_claim_target = target_tile
-                    return bh.Status.SUCCESS
+        if target_tile:
+            LogEntityEvent(
+                entity.tile,
+                "AI",
+                f"Found valid raid target.",
+                target_entity=target_tile
+
+            )
+
+            # 3. Trigger Raid Payload
+            action = entity.get("action")
+            action.trigger_event("raid")  # Use "raid" which sends the payload
+
+            # 4. Add Flavor Tag to Self
+            entity.tile.add_tag("opportunistic_raid")
+
+            # Store destination for payload system if needed (TriggerEventFromLibrary handles this now)
+            entity.tile.temp_dest = target_tile
+
+            LogEntityEvent(entity, "[AI] RAIDS", "Targeting " + target_tile.pos + "(Vulnerable).")
+            return bh.Status.SUCCESS
+
+        return bh.Status.FAILURE
+
 
-                return bh.Status.FAILURE
+class CheckAndExecuteAid(bh.Node):
+    __slots__ = ("ctx",)
 
-        class ExecuteClaimAction(bh.Node):
-            def tick(self):
-                econ = entity.tile.get_system("economy")
-                target_tile = getattr(entity.tile, "temp_claim_target", None)
+    def __init__(self, ctx):
+        self.ctx = ctx
 
-                if not target_tile:
-                    return bh.Status.FAILURE
+    def tick(self):
+        entity = self.ctx.entity
+        # 1. Uses unified personality traits. Read live: successful raids
+        # lower agreeableness (PayloadComponent in payload_entity.py).
+        if entity.get("personality").get("agreeableness") < AID_MIN_AGREEABLENESS:
+            return bh.Status.FAILURE
 
-                # 1. Spend Power Projection
-                econ["power_projection"] = econ.get("power_projection", 0) - CLAIM_COST
-                LogEntityEvent(entity, "AI:EXPANSION", f"Spent {CLAIM_COST} PP to claim {target_tile.pos}.")
+        # 2. Check Self-Resources: Must have a surplus to give aid
+        econ = self.ctx.econ
+        # if econ.get("supplies", 0) < econ.get("population", 1) * 1.5:
+        if econ.get("supplies", 0) < 20:
+            return bh.Status.FAILURE
 
-                # 2. Establish Claim System on Target Tile (Sub-settlement data)
-                target_tile.attach_system("claim", {
-                    "owner_id": entity.id,
-                    "power_projection": 1.0,  # Claim strength (can be increased later)
-                    "is_sub_settlement": True,
-                    "supplies_bonus": 0.5,  # Small base supplies bonus
-                })
+        # 3. Find Target: Check Memory for aid requests
+        mem = entity.get("memory")
+        pending = mem.aid_requests
 
-                # 3. Add Flavor Tag
-                entity.tile.add_tag("territorial_expansion")
+        if pending:
+            # Target found in memory (via DiplomacyComponent's broadcast); oldest request first
+            from_id = next(iter(pending))
+            v = pending[from_id][0]
+            coords = v["from"]
 
-                # 4. Cleanup temp data
-                if hasattr(entity.tile, "temp_claim_target"):
-                    del entity.tile.temp_claim_target
+            if coords:
+                # Find the tile (assumes index is available)
+                rx, ry = coords
+                world = entity.tile.index.world
+                target_tile = world[ry][rx]
 
+                # 4. Trigger Aid Payload (via DiplomacyComponent)
+                dip = entity.get("diplomacy")
+                dip.offer_aid(world, target_tile, amount_supplies=3)
+
+                # 5. Add Flavor Tag to Self
+                entity.tile.add_tag("diplomatic_support")
+
+                LogEntityEvent(entity, "[AI] AID", "Offering aid to " + target_tile.pos + "(Crisis).")
+                # Clear memory entry after action
+                del pending[from_id]
                 return bh.Status.SUCCESS
 
-        # Compose BT
-        root = bh.Selector([
-            bh.Sequence([CheckThreat(), DefendAction()]),  # Priority 1: DEFEND
-            CheckAndExecuteRaid(),  # Priority 2: RAID (Opportunistic)
-            CheckAndExecuteAid(),  # Priority 3: AID (Diplomatic)
-            bh.Sequence([CheckSupplyCrisis(), HandleSupplyAction()]),  # Priority 4: SELF-HELP (if raid/aid failed)
-            bh.Sequence([CheckProsperity(), CelebrateAction()]), # Priority 5 : Handle prosperity
-            bh.Sequence([CheckAmbitiousState(), HandleAmbitiousAction()]), # Priority 6: Handle Ambition
-            bh.Sequence([CheckCanClaimTile(), ExecuteClaimAction()]),  # Priority 7: CLAIM TILE
-            Idle()
-        ])
+        return bh.Status.FAILURE
+
+
+class CheckAmbitiousState(bh.Node):
+    __slots__ = ("ctx",)
+
+    def __init__(self, ctx):
+        self.ctx = ctx
+
+    def tick(self):
+        entity = self.ctx.entity
+        econ = self.ctx.econ
+        pers = entity.get("personality")
+        if not econ:
+            return bh.Status.FAILURE
+
+        # Prosperity Check: Only act when healthy (Supplies are NOT in crisis)
+        is_stable = econ["supplies"] > econ["population"] * 0.8
+
+        # Dominance Check: Is the trait score above threshold?
+        is_dominant = pers.get("dominance") > 0.6
+
+        # Wealth Check: Only invest ambition if there's wealth to risk
+        is_wealthy = econ.get("wealth", 0) > 150
+
+        if is_stable and is_dominant and is_wealthy:
+            return bh.Status.SUCCESS
+        return bh.Status.FAILURE
+
+
+# 📌 NEW NODE 2: Execute ambitious action (Raid or Hoard)
+class HandleAmbitiousAction(bh.Node):
+    __slots__ = ("ctx",)
+
+    def __init__(self, ctx):
+        self.ctx = ctx
+
+    def tick(self):
+        entity = self.ctx.entity
+        action = entity.get("action")
+        pers = entity.get("personality")
+
+        # If Aggressive, ambition manifests as expansion/raid
+        if pers.get("novelty") > 0.7 and pers.get("agreeableness") < 0.3:
+            # Trigger opportunistic raid event (seeks vulnerable target)
+            action.trigger_event("raid")
+            entity.tile.add_tag("seeking_dominance")
+
+            LogEntityEvent(entity, "[AI] AMBITION", "Triggered RAID for expansion.")
+
+        # If Cautious/Greedy, ambition manifests as hoarding wealth
+        else:
+            # Schedule a financial event to grow wealth long-term
+            from tile_events import ScheduleTileEvent
+            ScheduleTileEvent(entity.tile, "market_boom",
+                              start_tick=self.ctx.econ.get("id", 0) % 5 + 1)
+            entity.tile.add_tag("hoarding_wealth")
+            LogEntityEvent(entity, "[AI] AMBITION", "Triggered Market Boom for hoarding.")
+
+        return bh.Status.SUCCESS
+
+
+# --- NEW BORDER EXPANSION / TILE CLAIMING LOGIC (Priority 7) ---
+
+CLAIM_COST = 5.0  # Power projection cost to establish a claim
+CLAIM_SUPPLIES_THRESHOLD = 0.8  # Must have supplies > 80% of population
+CLAIM_RANGE = 3  # Search radius for unclaimed tiles
+
+
+class CheckCanClaimTile(bh.Node):
+    __slots__ = ("ctx",)
+
+    def __init__(self, ctx):
+        self.ctx = ctx
+
+    def tick(self):
+        entity = self.ctx.entity
+        econ = self.ctx.econ
+
+        if not econ:
+            return bh.Status.FAILURE
+
+        # 1. Check Resources & Stability
+        power_proj = econ.get("power_projection", 0)
+        is_stable = econ["supplies"] > econ["population"] * CLAIM_SUPPLIES_THRESHOLD
+
+        if power_proj < CLAIM_COST or not is_stable:
+            return bh.Status.FAILURE
+
+        # 2. Find Target: Look for nearby unclaimed tiles
+        target_tile = None
+
+        # Use a specific scan for tiles within the claim radius
+        world = entity.tile.index.world if getattr(entity.tile, "index", None) else None
+        if not world:
+            return bh.Status.FAILURE
+
+        # Note: This relies on GetTilesWithinRadius being available
+        for n_tile in GetTilesWithinRadius(world, entity.tile.x, entity.tile.y, radius=CLAIM_RANGE):
+            # Check if tile is valid (not self, not water/mountain)
+            if n_tile is entity.tile or n_tile.terrain in ["water", "mountain"]:
+                continue
+
+            claim_system = n_tile.get_system("claim")
+            if claim_system:
+                # Skip if already claimed
+                continue
+
+            # Target found! (Simple rule: claim the first available neutral tile)
+            target_tile = n_tile
+            break
+
+        if target_tile:
+            # Store the target for the action node
+            entity.tile.temp_claim_target = target_tile
+            return bh.Status.SUCCESS
+
+        return bh.Status.FAILURE
+
+
+class ExecuteClaimAction(bh.Node):
+    __slots__ = ("ctx",)
+
+    def __init__(self, ctx):
+        self.ctx = ctx
+
+    def tick(self):
+        entity = self.ctx.entity
+        econ = self.ctx.econ
+        target_tile = getattr(entity.tile, "temp_claim_target", None)
+
+        if not target_tile:
+            return bh.Status.FAILURE
+
+        # 1. Spend Power Projection
+        econ["power_projection"] = econ.get("power_projection", 0) - CLAIM_COST
+        LogEntityEvent(entity, "AI:EXPANSION", f"Spent {CLAIM_COST} PP to claim {target_tile.pos}.")
+
+        # 2. Establish Claim System on Target Tile (Sub-settlement data)
+        target_tile.attach_system("claim", {
+            "owner_id": entity.id,
+            "power_projection": 1.0,  # Claim strength (can be increased later)
+            "is_sub_settlement": True,
+            "supplies_bonus": 0.5,  # Small base supplies bonus
+        })
+        entity.get("settlement_ai").claims_owned += 1
+
+        # 3. Add Flavor Tag
+        entity.tile.add_tag("territorial_expansion")
+
+        # 4. Cleanup temp data
+        if hasattr(entity.tile, "temp_claim_target"):
+            del entity.tile.temp_claim_target
+
+        return bh.Status.SUCCESS
+
+
+# --- Sub-commodity categories ----------------------------------------------
+# oldUpdate boosts sub-commodities whose name contains one of these keywords.
+FOOD_SUB_KEYWORDS = ("grain", "meat", "fish")
+LUXURY_SUB_KEYWORDS = ("spices", "fruit")
+
+_sub_commodity_categories = {}  # name -> (is_food, is_luxury)
+
+def _sub_commodity_category(name):
+    """(is_food, is_luxury) for a sub-commodity name; substring tests run once per name."""
+    cat = _sub_commodity_categories.get(name)
+    if cat is None:
+        cat = _sub_commodity_categories[name] = (
+            any(k in name for k in FOOD_SUB_KEYWORDS),
+            any(k in name for k in LUXURY_SUB_KEYWORDS),
+        )
+    return cat
+
+
+class SettlementRootPolicy(bh.Node):
+    """
+    Root of the settlement tree as a decision table: (condition, action)
+    rows tried in priority order, then a fallback. Same semantics as a
+    Selector of Sequence([condition, action]) children, minus the generic
+    Selector/Sequence call frames. A row with action None is a single node.
+    """
+    __slots__ = ("rows", "fallback")
+
+    def __init__(self, rows, fallback):
+        self.rows = tuple(rows)
+        self.fallback = fallback
+
+    def tick(self):
+        SUCCESS = bh.Status.SUCCESS
+        FAILURE = bh.Status.FAILURE
+        for cond, act in self.rows:
+            status = cond.tick()
+            if status == FAILURE:
+                continue
+            if act is None or status != SUCCESS:
+                return status
+            status = act.tick()
+            if status != FAILURE:
+                return status
+        return self.fallback.tick()
+
+
+class SettlementAIComponent(Component):
+    # Global tuning knob: this component's econ recording, VAS impulse loop and
+    # BT tick run every tick_rate updates. The perception, memory and emotion
+    # components are not gated; Entity.update still runs them every step.
+    # The phase is the settlement's economy id, assigned in creation order by
+    # InitializeWorldSystems, so each tick handles an even 1/tick_rate slice of
+    # the settlements and every world built from a seed gets the same schedule.
+    tick_rate = 5
+
+    def __init__(self, tick_phase=0):
+        super().__init__("settlement_ai")
+        self._bt_built = False
+        self._steps = 0
+        self._tick_phase = tick_phase
+        # sibling components, looked up on first update
+        self._components = None
+        # claims established by ExecuteClaimAction and not yet lost to upkeep
+        self.claims_owned = 0
+        # tendency-derived BT input, filled in by _build_behavior_tree
+        self.raid_drive_base = 0.0
+
+    # Shared across all settlements, built on first use
+    _SHARED_BT = None
+    _BT_CONTEXT = SettlementBTContext()
+
+    def _build_behavior_tree(self):
+        """
+        Build a compact BT capturing:
+          - defend_if_threat (bandits nearby)
+          - handle_supply_crisis (increase supplies / request aid)
+          - celebrate_if_prosperous (festival)
+          - idle (do maintenance)
+        The tree structure is identical for every settlement, so it is built
+        once and bound to this entity through the shared tick context.
+        """
+        cls = SettlementAIComponent
+        ctx = cls._BT_CONTEXT
+
+        if cls._SHARED_BT is None:
+            # Compose BT
+            cls._SHARED_BT = SettlementRootPolicy([
+                (CheckThreat(ctx), DefendAction(ctx)),  # Priority 1: DEFEND
+                (CheckAndExecuteRaid(ctx), None),  # Priority 2: RAID (Opportunistic)
+                (CheckAndExecuteAid(ctx), None),  # Priority 3: AID (Diplomatic)
+                (CheckSupplyCrisis(ctx), HandleSupplyAction(ctx)),  # Priority 4: SELF-HELP (if raid/aid failed)
+                (CheckProsperity(ctx), CelebrateAction(ctx)), # Priority 5 : Handle prosperity
+                (CheckAmbitiousState(ctx), HandleAmbitiousAction(ctx)), # Priority 6: Handle Ambition
+                (CheckCanClaimTile(ctx), ExecuteClaimAction(ctx)),  # Priority 7: CLAIM TILE
+            ], fallback=Idle(ctx))
+
+        # Tendencies are only written by apply_geo_bias in the settlement
+        # factory and never after, so the base raid drive is computed once here.
+        # (Personality traits do change at runtime, so they are read per tick.)
+        self.raid_drive_base = raid_drive_from(self.entity.get("tendency"))
+
         # attach onto AI component (entity.get("ai").behavior_tree)
-        ai_comp = entity.get("ai")
+        ai_comp = self.entity.get("ai")
         if ai_comp:
-            ai_comp.behavior_tree = root
+            ai_comp.behavior_tree = cls._SHARED_BT
+            ai_comp.bt_context = ctx
+            ai_comp.external_tick = True  # ticked from update() on our schedule
         self._bt_built = True
 
     def update(self, world):
@@ -394,6 +623,7 @@ class SettlementAIComponent(Component):
           - perception & memory recording
           - emotions updated automatically via emotion component
           - ensure BT exists and let AIComponent.tick() run it
+        Everything after claim upkeep only runs every tick_rate updates.
         """
         tile = self.entity.tile
         econ = tile.get_system("economy")
@@ -405,16 +635,6 @@ class SettlementAIComponent(Component):
         if "power_projection" not in econ:
             econ["power_projection"] = 10.0  # Starting PP
 
-        # ensure subcomponents exist
-        mem = self.entity.get("memory")
-        emo = self.entity.get("emotion")
-        dip = self.entity.get("diplomacy")
-        action = self.entity.get("action")
-        ai = self.entity.get("ai")
-        perc = self.entity.get("perception")
-        pers = self.entity.get("personality")
-        rel = self.entity.get("relationship")
-
         # -----------------------------------------------------------------
         # NEW: Claim Maintenance and Supplies Bonus (High-Priority Update)
         # -----------------------------------------------------------------
@@ -424,8 +644,12 @@ class SettlementAIComponent(Component):
         owned_claims_bonus = 0.0
 
         try:
-            # Check tiles within radius (assuming claims are nearby for local calculation)
-            nearby_tiles = GetTilesWithinRadius(entity.tile.index.world, tile.x, tile.y, radius=MAINTENANCE_RADIUS)
+            # Only claimed tiles within radius matter; the index's claim buckets
+            # yield them directly instead of scanning the whole square. A
+            # settlement without claims has nothing to maintain.
+            nearby_tiles = ()
+            if self.claims_owned:
+                nearby_tiles = entity.tile.index.with_system_within("claim", tile.x, tile.y, MAINTENANCE_RADIUS)
 
             for n_tile in nearby_tiles:
                 claim = n_tile.get_system("claim")
@@ -436,7 +660,8 @@ class SettlementAIComponent(Component):
 
                     # 2. Check for loss of claim
                     if econ.get("power_projection", 0) <= 0:
-                        n_tile.systems.pop("claim", None)  # Remove the claim system
+                        n_tile.detach_system("claim")  # Remove the claim system
+                        self.claims_owned -= 1
                         LogEntityEvent(entity, "[AI] BORDER", f"Lost claim on {n_tile.pos} (No PP).")
                     else:
                         # 3. Apply Supplies Bonus (only if claim is maintained)
@@ -457,9 +682,33 @@ class SettlementAIComponent(Component):
 
         # -----------------------------------------------------------------
 
+        # Claim upkeep above runs every tick; the rest only on this settlement's
+        # round-robin slot, unless it currently perceives a threat (urgent).
+        self._steps += 1
+        if (self._steps + self._tick_phase) % self.tick_rate != 0:
+            perc = entity.get("perception")
+            if not (perc and _perceives_threat(perc.blackboard)):
+                return
+
+        # ensure subcomponents exist. The factory attaches every component up
+        # front and they are never swapped, so resolve them once and reuse.
+        comps = self._components
+        if comps is None:
+            get = entity.get
+            comps = self._components = (
+                get("memory"), get("emotion"), get("ai"),
+                get("perception"), get("personality"), get("relationship"),
+            )
+        mem, emo, ai, perc, pers, rel = comps
+
+        # age pending aid requests in decision ticks, so none expire unseen
+        # on the updates this settlement skips
+        if mem:
+            mem.expire_aid_requests()
+
         # 1) record economics into memory for trend detection
         if mem:
-            mem.record_econ(econ)
+            mem.record_econ(econ["supplies"], econ["wealth"], econ["population"])
 
         # 2) react to persistent tags (weather already handled earlier)
         weather = tile.get_system("weather")
@@ -485,6 +734,7 @@ class SettlementAIComponent(Component):
 
         neighbors = perc.blackboard.get("neighbors", [])
         total_v, total_a, total_s = 0, 0, 0
+        rel_updates = []
         for n in neighbors:
             if not n.entities: continue
             target_id = n.entities[0].id
@@ -513,23 +763,29 @@ class SettlementAIComponent(Component):
 
             # --- STEP 5: Update Relationship Memory EMA ---
             # R'v = 0.9Rv + 0.1V | R's = 0.9Rs + 0.1S
+            # (batched below; each neighbor has its own target, so reads above are unaffected)
             if rel:
                 scalar = 0.5
-                rel.update_relationship(target_id, v_event, s_event * scalar)
+                rel_updates.append((target_id, v_event, s_event * scalar))
+
+        if rel_updates:
+            rel.update_relationships(rel_updates)
 
         emo.apply_impulse(total_v, total_a, total_s)
 
         # --- STEP 6: Logging Interpretation ---
-        label = emo.get_current_label()
-        LogEntityEvent(entity, "AI:EMOTION VAS", f"State: {label} (V:{emo.v:.2f}, A:{emo.a:.2f}, S:{emo.s:.2f})")
+        if DEBUG_SETTLEMENT_AI:
+            label = emo.get_current_label()
+            LogEntityEvent(entity, "AI:EMOTION VAS", f"State: {label} (V:{emo.v:.2f}, A:{emo.a:.2f}, S:{emo.s:.2f})")
 
         # 3) lazy-build behaviour tree (only once per entity)
         if not self._bt_built:
             self._build_behavior_tree()
 
-        # 4) Let AI component tick the BT (AIComponent.update handles tick)
+        # 4) Let AI component tick the BT (AIComponent.tick handles it)
         if ai:
-            ai.update(world)
+            self._BT_CONTEXT.econ = econ
+            ai.tick()
 
     def oldUpdate(self, world):
         """
@@ -561,20 +817,18 @@ class SettlementAIComponent(Component):
         # hunger condition
         if supplies < pop * pop_weight:
             tile.add_tag("hungry")
-            tile.remove_tag("food_secure") if tile.has_tag("food_secure") else None
+            tile.remove_tag("food_secure")
         else:
             tile.add_tag("food_secure")
-            tile.remove_tag("hungry") if tile.has_tag("hungry") else None
+            tile.remove_tag("hungry")
 
         # wealth condition
         if econ["wealth"] < 80:
             tile.add_tag("poor")
-            if tile.has_tag("wealthy"):
-                tile.remove_tag("wealthy")
+            tile.remove_tag("wealthy")
         elif econ["wealth"] > 120:
             tile.add_tag("wealthy")
-            if tile.has_tag("poor"):
-                tile.remove_tag("poor")
+            tile.remove_tag("poor")
 
         # ---------------------------------------------------------
         # BABY STEP 2 — Simple Goal: Increase Supplies
@@ -588,17 +842,18 @@ class SettlementAIComponent(Component):
         # ---------------------------------------------------------
         subs = econ.get("sub_commodities", {})
 
-        # If starving → grow food faster
-        if tile.has_tag("hungry"):
-            for name in subs:
-                if "grain" in name or "meat" in name or "fish" in name:
-                    subs[name] += 0.3  # small growth boost
-
-        # If wealthy → upgrade luxuries (narrative flourish)
-        if tile.has_tag("wealthy"):
-            for name in subs:
-                if "spices" in name or "fruit" in name:
-                    subs[name] += 0.1
+        # If starving → grow food faster; if wealthy → upgrade luxuries
+        # (narrative flourish). Both boosts are applied in one pass over subs.
+        hungry = tile.has_tag("hungry")
+        wealthy = tile.has_tag("wealthy")
+        if hungry or wealthy:
+            for name, val in subs.items():
+                is_food, is_luxury = _sub_commodity_category(name)
+                if hungry and is_food:
+                    val += 0.3  # small growth boost
+                if wealthy and is_luxury:
+                    val += 0.1
+                subs[name] = val
 
         # ================================================================
         # BABY STEP 4 — Weather Reaction
@@ -619,8 +874,7 @@ class SettlementAIComponent(Component):
 
             elif w_state == "rain":
                 # healing effect
-                if tile.has_tag("water_crisis"):
-                    tile.remove_tag("water_crisis")
+                tile.remove_tag("water_crisis")
 
         # ================================================================
         # BABY STEP 5 — Neighbor Awareness
@@ -640,6 +894,8 @@ class SettlementAIComponent(Component):
                 nearby_struggling = True
             if n.has_tag("wealthy") or n.has_tag("trade_hub"):
                 nearby_prosperous = True
+            if nearby_bandits and nearby_struggling and nearby_prosperous:
+                break  # nothing left to learn from the rest of the neighborhood
 
         # Social interpretation
         if nearby_bandits:
@@ -649,8 +905,7 @@ class SettlementAIComponent(Component):
         if nearby_struggling and not nearby_bandits:
             tile.add_tag("empathetic")  # possible future trade or aid
         else:
-            if tile.has_tag("empathetic"):
-                tile.remove_tag("empathetic")
+            tile.remove_tag("empathetic")
 
         # ================================================================
         # BABY STEP 6 — Micro-Events
@@ -24,6 +24,10 @@ def CreateSettlementAI(tile):
         "resource_stability": 0, "environmental_threat": 0,
         "mobility_constraint": 0, "isolation_level": 0
     }
+    # economy ids are assigned in creation order; use them as the AI tick phase
+    econ = tile.get_system("economy")
+    tick_phase = econ["id"] if econ else 0
+
     Tendency = TendencyComponent()
     Tendency.apply_geo_bias(geo_pressure)
 
@@ -36,7 +40,7 @@ def CreateSettlementAI(tile):
     e.add_component(RelationshipComponent())
     e.add_component(EmotionComponent())
     e.add_component(DiplomacyComponent())
-    e.add_component(SettlementAIComponent())
+    e.add_component(SettlementAIComponent(tick_phase=tick_phase))
     e.add_component(Tendency)
     # tile.entities.append(e)
     return e
@@ -11,5 +11,5 @@ def UpdateAllEntities(world, macro, clock, region):
                     tile.entities.remove(ent)
 
                     # also cleanup tile.payloads
-                    if hasattr(tile, "payloads") and ent in tile.payloads:
-                        tile.payloads.remove(ent)
\ No newline at end of file
+                    if hasattr(tile, "payloads"):
+                        tile.payloads.discard(ent)
\ No newline at end of file
@@ -4,6 +4,7 @@ from timesim import TimeSystem
 from tile_memory import SnapshotTileState
 from world_utils import GetActiveTiles
 from trade_routes import ApplyTradeEffects, GenerateTradeRoutes
+from economy import SettlementEconomyAgent, pick_random_sub_commodity
 
 class EventManager:
     """
@@ -65,13 +66,15 @@ def TickSettlements(world, macro, clock, region=None):
     rng = clock.rng
 
     for tile in GetActiveTiles(world, "economy"):
-        if tile.get_system("economy"):
+        econ = tile.get_system("economy")
+        if econ:
+            agent = SettlementEconomyAgent(tile, rng)
             if rng.random() < 0.5:
-                tile.agent.add_supplies(-0.5, 1)
+                agent.add_supplies(-0.5, 1)
             if rng.random() < 0.4:
-                tile.agent.add_wealth(-0.5, 1)
+                agent.add_wealth(-0.5, 1)
             if rng.random() < 0.3:
-                subs = tile.get_system("economy").get("sub_commodities", {})
+                subs = econ.get("sub_commodities", {})
                 if subs:
-                    cname = rng.choice(list(subs.keys()))
-                    tile.agent.add_sub_commodity(0.5, cname)
+                    cname = pick_random_sub_commodity(subs, rng)
+                    agent.add_sub_commodity(0.5, cname)
@@ -66,18 +66,16 @@ def CreateWorld(world_time = None, master_seed = 12345):
 
     # --- IMPORTANT: some later passes modify terrain (oases, drylands, settlements).
     # Recompute soil + resource systems now that terrain is finalized.
-    # This ensures resources reflect final tiles (used by InitializeSettlementEconomy).
+    # This ensures resources reflect final tiles (used by InitializeWorldSystems).
     world = ComputeSoilAndResources(world, rng)
 
     # Calculate and attach geo_pressure for NPC tendency forming
     world = ComputeGeoPressure(world, rng)
 
     world = SeedFloraFauna(world, rng)
-    world = ConvertBiotaToCounts(world)
     world = InitializeEcosystemFromBiota(world, rng)
 
-    world = InitializeSettlementEconomy(world, rng)
-    AttachSettlementAgents(world)
+    world = InitializeWorldSystems(world, rng)
 
     return world, macro
 
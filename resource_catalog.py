@@ -210,9 +210,12 @@ RESOURCE_CATALOG = {
         "desc": "Rare seed symbolizing purity and wealth."
     },
 }
+# name -> category type, materialized once (looked up per commodity per tick)
+RESOURCE_TYPE_BY_NAME = {name: entry.get("type", "unknown") for name, entry in RESOURCE_CATALOG.items()}
+
 def GetResourceType(name: str) -> str:
     """Return the category type (material/food/trade/luxury) of a resource."""
-    return RESOURCE_CATALOG.get(name, {}).get("type", "unknown")
+    return RESOURCE_TYPE_BY_NAME.get(name, "unknown")
 
 def IsResourceType(name: str, rtype: str) -> bool:
     """Check if a resource matches a given category."""
@@ -62,9 +62,7 @@ def main():
 
     # print ("some trade links:", trade_links[1646][0])
 
-    # Settlement economy + agents already created by:
-    # InitializeSettlementEconomy
-    # AttachSettlementAgents
+    # Settlement economy + agents already created by InitializeWorldSystems
 
     # ----------------------------------------------------
     # Select two settlement tiles for testing
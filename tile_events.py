@@ -410,8 +410,8 @@ def TriggerEventFromLibrary(tile, event_name):
 
     tile.entities.append(payload)
     if not hasattr(tile, "payloads"):
-        tile.payloads = []
-    tile.payloads.append(payload)
+        tile.payloads = set()
+    tile.payloads.add(payload)
 
     LogEntityEvent(
         tile,
@@ -482,8 +482,8 @@ def HandleSpreadRumor(world, entity, routes):
 
         source_tile.entities.append(e)
         if not hasattr(source_tile, "payloads"):
-            source_tile.payloads = []
-        source_tile.payloads.append(e)
+            source_tile.payloads = set()
+        source_tile.payloads.add(e)
 
         LogEntityEvent(
             source_tile,
@@ -8,6 +8,10 @@ class TileState:
     Includes terrain, biome, mobility, entities, and subsystem (eco/economy/etc.) data.
     """
 
+    # Bumped whenever any tile gains or loses a subsystem, so callers can
+    # cache per-system tile lists and rebuild them only when this changes.
+    systems_version = 0
+
     def __init__(
         self,
         x: int,
@@ -39,6 +43,7 @@ class TileState:
         self.movement_method = movement_method or []
         self.movement_cost = movement_cost or 1
         self.entities = entities or []
+        self._tag_set = None
         self.tags = tags or []
         self.regions = regions or {}
         self.systems = systems or {}
@@ -49,8 +54,28 @@ class TileState:
     def pos(self) -> Tuple[int, int]:
         return (self.x, self.y)
 
+    @property
+    def tags(self) -> List[str]:
+        return self._tags
+
+    @tags.setter
+    def tags(self, tags: List[str]):
+        self._tags = tags
+        self._tag_set = None
+
+    @property
+    def tag_set(self) -> frozenset:
+        """
+        Hashed snapshot of `tags` for O(1) membership checks.
+        Rebuilt lazily after any change made through the tag methods below
+        (mutate tags through them rather than editing the list in place).
+        """
+        if self._tag_set is None:
+            self._tag_set = frozenset(self._tags)
+        return self._tag_set
+
     def has_tag(self, tag: str) -> bool:
-        return tag in self.tags
+        return tag in self.tag_set
 
     def set_terrain(self, new_terrain):
         old = self.terrain
@@ -63,32 +88,49 @@ class TileState:
             return
         tag = tag.strip().lower()
 
-        if tag not in self.tags:
-            self.tags.append(tag)
+        if tag not in self.tag_set:
+            self._tags.append(tag)
+            self._tag_set = None
             if self.index:
                 self.index.register_tag(self, tag)
 
     def remove_tag(self, tag):
-        if tag in self.tags:
-            self.tags.remove(tag)
+        if tag in self.tag_set:
+            self._tags.remove(tag)
+            self._tag_set = None
             if self.index:
                 self.index.unregister_tag(self, tag)
 
+    def replace_tag(self, old: Optional[str], new: str):
+        """Swap one tag for another in a single step (e.g. weather state changes)."""
+        self.remove_tag(old)
+        self.add_tag(new)
+
     def set_tags(self, tags: list[str]):
         """Replace tags entirely (useful for weather or biome resets)."""
         self.tags = list(dict.fromkeys(tags))  # remove dupes, preserve order
 
     def has_any_tag(self, *tags: str) -> bool:
-        return any(t in self.tags for t in tags)
+        return not self.tag_set.isdisjoint(tags)
 
     def attach_system(self, name: str, data: dict):
         first_time = name not in self.systems
         self.systems[name] = data
 
-        if self.index:
-            if first_time:
+        if first_time:
+            TileState.systems_version += 1
+            if self.index:
                 self.index.register_system(self, name)
 
+    def detach_system(self, name: str):
+        """Remove a subsystem (if present) and keep the world index in sync."""
+        data = self.systems.pop(name, None)
+        if data is not None:
+            TileState.systems_version += 1
+            if self.index:
+                self.index.unregister_system(self, name)
+        return data
+
     def get_system(self, name: str):
         return self.systems.get(name)
 
@@ -99,6 +141,7 @@ class TileState:
         """
         if name not in self.systems:
             self.systems[name] = dict(default or {})
+            TileState.systems_version += 1
         return self.systems[name]
 
     # --- Export compatibility ---------------------------------------------
@@ -418,8 +418,7 @@ def TagSettlements(world, profiles, routes):
         # remove old derived tags first
         for tag in ["prosperous", "struggling", "supplies_deficit",
                     "trade_hub", "bandit_settlement", "bandit_infested_settlement"]:
-            if tag in tile.tags:
-                tile.tags.remove(tag)
+            tile.remove_tag(tag)
 
         # assign prosperity-level tags
         if prosperity > 200:
@@ -452,11 +451,9 @@ def TagSettlements(world, profiles, routes):
         entityA = get_settlement_ai(tile)
         if entityA:
             rel_comp = entityA.get("relationship")
-            if rel_comp:
-                for score in rel_comp.table.values():
-                    if score['rv'] < -0.5 and score['rs'] < -0.5:  # Strong rivalry (potential conflict trigger)
-                        local_risk_score += 1
-                        break  # Only need one hostile neighbor to trigger this factor
+            # Strong rivalry (potential conflict trigger); one hostile neighbor is enough
+            if rel_comp and rel_comp.has_rivalry(-0.5, -0.5):
+                local_risk_score += 1
 
         # Risk Factor C: High wilderness exposure (Local Environment)
         neighbor_tiles = GetTilesWithinRadius(world, tile.x, tile.y, radius=3)
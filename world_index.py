@@ -1,6 +1,13 @@
 # directory world_index.py/
 from collections import defaultdict
 
+# Bucket edge (in tiles) for nearest_with_system's grid search
+NEAREST_BUCKET_SIZE = 8
+
+def _row_major(tile):
+    return (tile.y, tile.x)
+
+
 class WorldIndex:
     """
     Fully corrected & optimized world index.
@@ -25,6 +32,16 @@ class WorldIndex:
         # tag -> set(tile)
         self.tag_index = defaultdict(set)
 
+        # settlement id -> tile (economy tiles only)
+        self.settlement_index = {}
+
+        # system_name -> cached list(tile), dropped when membership changes
+        self._system_list_cache = {}
+
+        # system_name -> {(bx, by): [tile]} bucket grid for nearest queries,
+        # dropped together with the list cache
+        self._system_bucket_cache = {}
+
         # build initial index
         self.rebuild()
 
@@ -36,6 +53,9 @@ class WorldIndex:
         self.system_index.clear()
         self.terrain_index.clear()
         self.tag_index.clear()
+        self.settlement_index.clear()
+        self._system_list_cache.clear()
+        self._system_bucket_cache.clear()
 
         for row in self.world:
             for tile in row:
@@ -44,6 +64,9 @@ class WorldIndex:
                 for sys_name in tile.systems.keys():
                     self.system_index[sys_name].add(tile)
 
+                # settlements
+                self._index_settlement(tile)
+
                 # terrain
                 self.terrain_index[tile.terrain].add(tile)
 
@@ -56,11 +79,29 @@ class WorldIndex:
     # ----------------------------------------------------------------------
     def register_system(self, tile, name):
         self.system_index[name].add(tile)
+        self._system_list_cache.pop(name, None)
+        self._system_bucket_cache.pop(name, None)
+        if name == "economy":
+            self._index_settlement(tile)
 
     def unregister_system(self, tile, name):
         s = self.system_index.get(name)
         if s:
             s.discard(tile)  # safe remove
+        self._system_list_cache.pop(name, None)
+        self._system_bucket_cache.pop(name, None)
+        if name == "economy":
+            self._unindex_settlement(tile)
+
+    def _index_settlement(self, tile):
+        econ = tile.systems.get("economy")
+        if econ and "id" in econ:
+            self.settlement_index[econ["id"]] = tile
+
+    def _unindex_settlement(self, tile):
+        for sid, t in list(self.settlement_index.items()):
+            if t is tile:
+                del self.settlement_index[sid]
 
     def register_tag(self, tile, tag):
         self.tag_index[tag].add(tile)
@@ -82,7 +123,17 @@ class WorldIndex:
     # QUERY API (returns lists for compatibility)
     # ----------------------------------------------------------------------
     def with_system(self, system_name):
-        return list(self.system_index.get(system_name, ()))
+        """
+        Cached list of tiles carrying the system. The list is shared between
+        callers and rebuilt only after a register/unregister for that system,
+        so treat it as read-only.
+        """
+        cached = self._system_list_cache.get(system_name)
+        if cached is None:
+            # Row-major order, so seeded runs visit tiles reproducibly
+            cached = sorted(self.system_index.get(system_name, ()), key=_row_major)
+            self._system_list_cache[system_name] = cached
+        return cached
 
     def with_terrain(self, terrain):
         return list(self.terrain_index.get(terrain, ()))
@@ -90,6 +141,34 @@ class WorldIndex:
     def with_tag(self, tag):
         return list(self.tag_index.get(tag, ()))
 
+    def has_tag_with_system(self, tag, system_name):
+        """True if any tile carrying `tag` also has `system_name` (set intersection, no scan)."""
+        tagged = self.tag_index.get(tag)
+        if not tagged:
+            return False
+        return not tagged.isdisjoint(self.system_index.get(system_name, ()))
+
+    def with_all_tags(self, tags, system_name=None):
+        """
+        New set of tiles carrying every tag in `tags` (and `system_name`, if
+        given), by intersecting the index sets rather than testing each tile.
+        """
+        result = None
+        for tag in tags:
+            tagged = self.tag_index.get(tag)
+            if not tagged:
+                return set()
+            result = set(tagged) if result is None else result & tagged
+        if result and system_name is not None:
+            result &= self.system_index.get(system_name, set())
+        return result or set()
+
+    def settlement_by_id(self, settlement_id):
+        return self.settlement_index.get(settlement_id)
+
+    def settlement_ids(self):
+        return list(self.settlement_index.keys())
+
     def tiles_within_radius(self, center_x, center_y, radius):
         """
         Return list of tiles within Chebyshev distance radius from (center_x, center_y).
@@ -103,14 +182,72 @@ class WorldIndex:
                 result.append(self.world[y][x])
         return result
 
-    def nearest_with_system(self, system_name, from_x, from_y, max_radius=50):
+    def _system_buckets(self, system_name):
+        buckets = self._system_bucket_cache.get(system_name)
+        if buckets is None:
+            buckets = {}
+            B = NEAREST_BUCKET_SIZE
+            for t in self.with_system(system_name):
+                buckets.setdefault((t.x // B, t.y // B), []).append(t)
+            self._system_bucket_cache[system_name] = buckets
+        return buckets
+
+    def with_system_within(self, system_name, center_x, center_y, radius, include_center=False):
+        """
+        Tiles carrying the system within Chebyshev distance `radius`, in
+        row-major order (same order as GetTilesWithinRadius). Only the buckets
+        overlapping the square are read, so sparse systems cost O(matches)
+        instead of a full (2r+1)^2 scan.
+        """
+        buckets = self._system_buckets(system_name)
+        if not buckets:
+            return []
+        B = NEAREST_BUCKET_SIZE
+        x0, x1 = center_x - radius, center_x + radius
+        y0, y1 = center_y - radius, center_y + radius
+        result = []
+        for by in range(y0 // B, y1 // B + 1):
+            for bx in range(x0 // B, x1 // B + 1):
+                for t in buckets.get((bx, by), ()):
+                    if x0 <= t.x <= x1 and y0 <= t.y <= y1:
+                        if include_center or t.x != center_x or t.y != center_y:
+                            result.append(t)
+        result.sort(key=_row_major)
+        return result
+
+    def nearest_with_system(self, system_name, from_x, from_y, max_radius=50, exclude=None):
         """
-        Find nearest tile with a specific system. Uses index fast-path then radius scan fallback.
+        Find nearest tile (Euclidean) with a specific system, skipping `exclude`.
+        Searches a bucket grid ring by ring, so only nearby tiles are measured;
+        ties go to the first tile in row-major order.
         """
-        # fast path using index sets
-        tiles = list(self.system_index.get(system_name, ()))
-        if tiles:
-            best = min(tiles, key=lambda t: (t.x - from_x) ** 2 + (t.y - from_y) ** 2)
+        buckets = self._system_buckets(system_name)
+        if buckets:
+            B = NEAREST_BUCKET_SIZE
+            bx0, by0 = from_x // B, from_y // B
+            H = len(self.world)
+            W = len(self.world[0]) if H > 0 else 0
+            max_ring = max(bx0, by0, (W - 1) // B - bx0, (H - 1) // B - by0)
+            best = None
+            best_key = None
+            for r in range(max_ring + 1):
+                for by in range(by0 - r, by0 + r + 1):
+                    edge_row = by == by0 - r or by == by0 + r
+                    step = 1 if edge_row else 2 * r
+                    for bx in range(bx0 - r, bx0 + r + 1, step or 1):
+                        for t in buckets.get((bx, by), ()):
+                            if t is exclude:
+                                continue
+                            dx = t.x - from_x
+                            dy = t.y - from_y
+                            key = (dx * dx + dy * dy, t.y, t.x)
+                            if best_key is None or key < best_key:
+                                best_key = key
+                                best = t
+                # Tiles outside ring r are at least r*B + 1 away on some axis
+                bound = r * B + 1
+                if best is not None and best_key[0] < bound * bound:
+                    return best
             return best
 
         # fallback expanding radius search
@@ -118,6 +255,6 @@ class WorldIndex:
             for y in range(max(0, from_y - r), min(len(self.world), from_y + r + 1)):
                 for x in range(max(0, from_x - r), min(len(self.world[0]), from_x + r + 1)):
                     t = self.world[y][x]
-                    if t.get_system(system_name):
+                    if t is not exclude and t.get_system(system_name):
                         return t
-        return None
\ No newline at end of file
+        return None
@@ -5,6 +5,7 @@ from tile_state import TileState
 from worldgen import GetNeighborsRadius
 from math import sqrt
 from resource_catalog import GetResourcesForTile
+import world_index_store
 import time
 SYMBOLS = {
     "plains": "🌿",
@@ -70,47 +71,71 @@ def SpreadTag(world, x, y, tag: str, radius: int = 1, chance: float = 1.0, inclu
     return count
 
 
+# system_name -> (world, TileState.systems_version, tiles) for the no-index path
+_active_tile_cache = {}
+
 def GetActiveTiles(world, system_name):
     """
     Return list of tiles that have a specific system (e.g., economy).
 
     Behavior:
       - If a global WorldIndex is available via world_index_store.world_index,
-        use that index (fast).
+        return its cached per-system list (no grid scan, no copy).
       - Otherwise fall back to scanning the whole world (backwards-compatible).
 
-    This keeps all callers unchanged while giving instant speed benefits
-    when the index is initialized and exposed in world_index_store.world_index.
+    Either way the list is shared and only rebuilt when a tile gains or
+    loses the system, so callers must not mutate it.
     """
-    # Lazy import to avoid circular import problems at module import time.
-    try:
-        # world_index_store should be a tiny module with `world_index = None`
-        # main.py should set world_index_store.world_index = world_index after building it.
-        import world_index_store
-        widx = getattr(world_index_store, "world_index", None)
-        if widx:
-            # return a copy to avoid callers mutating internal index lists
-            return list(widx.with_system(system_name))
-    except Exception:
-        # If anything goes wrong (module missing, import error, etc), fall through to scan
-        pass
-
-    # Backward-compatible full-scan fallback
-    return [t for row in world for t in row if t.get_system(system_name)]
+    widx = world_index_store.world_index
+    if widx:
+        return widx.with_system(system_name)
+
+    # Backward-compatible full-scan fallback, cached until any tile gains or
+    # loses a subsystem (TileState.systems_version)
+    cached = _active_tile_cache.get(system_name)
+    if cached and cached[0] is world and cached[1] == TileState.systems_version:
+        return cached[2]
+    tiles = [t for row in world for t in row if t.get_system(system_name)]
+    _active_tile_cache[system_name] = (world, TileState.systems_version, tiles)
+    return tiles
+
+# (x, y, radius, include_center) -> neighborhood list for _neighborhood_world.
+# The grid never swaps tile objects, so a neighborhood is fixed once computed.
+_neighborhood_cache = {}
+_neighborhood_world = None
+NEIGHBORHOOD_CACHE_MAX = 8192  # entries; cleared wholesale when full
 
 def GetTilesWithinRadius(world, x, y, radius=3, include_center=False):
     """
     Return tiles within Chebyshev distance `radius` (square neighborhood).
     Keeps bounds checks. Returns list[TileState].
+
+    Results are memoized per world, so the list is shared between callers
+    and must not be mutated.
     """
+    global _neighborhood_world
+    if world is not _neighborhood_world:
+        _neighborhood_cache.clear()
+        _neighborhood_world = world
+
+    key = (x, y, radius, include_center)
+    result = _neighborhood_cache.get(key)
+    if result is not None:
+        return result
+
     height = len(world)
     width = len(world[0]) if height > 0 else 0
     result = []
     for ny in range(max(0, y - radius), min(height, y + radius + 1)):
+        row = world[ny]
         for nx in range(max(0, x - radius), min(width, x + radius + 1)):
             if nx == x and ny == y and not include_center:
                 continue
-            result.append(world[ny][nx])
+            result.append(row[nx])
+
+    if len(_neighborhood_cache) >= NEIGHBORHOOD_CACHE_MAX:
+        _neighborhood_cache.clear()
+    _neighborhood_cache[key] = result
     return result
 
 def GetNearestTileWithSystem(world, x, y, system_name, max_radius=20):
@@ -119,18 +144,12 @@ def GetNearestTileWithSystem(world, x, y, system_name, max_radius=20):
     searching by increasing radius (Manhattan/Chebyshev). Returns None if not found.
     """
     # try world_index fast-path if available
-    try:
-        import world_index_store
-        widx = getattr(world_index_store, "world_index", None)
-        if widx:
-            candidates = widx.with_system(system_name)
-            if not candidates:
-                return None
-            # simple nearest by Euclidean distance
-            best = min(candidates, key=lambda t: (t.x - x) ** 2 + (t.y - y) ** 2)
-            return best
-    except Exception:
-        pass
+    widx = world_index_store.world_index
+    if widx:
+        # nearest by Euclidean distance (bucket-grid search)
+        if not widx.with_system(system_name):
+            return None
+        return widx.nearest_with_system(system_name, x, y)
 
     # fallback: scan in expanding radius
     for r in range(max_radius + 1):
@@ -1103,11 +1103,7 @@ def UpdateWeather(world, world_time, rng=None,
             wsys["state"] = state
 
             # --- Update tile tags (fast replace) ---
-            tgs = tile.tags
-            if old_state in tgs:
-                tgs.remove(old_state)
-            if state not in tgs:
-                tgs.append(state)
+            tile.replace_tag(old_state, state)
 
             # --- Season ---
             phase, name = season_phase(climate)
@@ -1142,8 +1138,7 @@ def UpdateWeather(world, world_time, rng=None,
             wsys["direction"] = tag
 
             # Add tag if missing
-            if tag not in tile.tags:
-                tile.tags.append(tag)
+            tile.add_tag(tag)
 
     # ------------------------------------------------------------
     # PASS 3 — HUMIDITY diffusion (buffer-based, no neighbor scans)
@@ -1483,8 +1478,7 @@ def RefineDrylandBiomes(world, rng):
                 'montane_forest', 'rainforest', 'savanna', 'mangrove',
                 'scrubland', 'steppe', 'cold_steppe', 'semi_arid', 'semi_savanna', 'desert'
             ]
-            tile.tags = [t for t in tile.tags if t not in biome_tags]
-            tile.tags.append(biome_tag)
+            tile.tags = [t for t in tile.tags if t not in biome_tags] + [biome_tag]
             tile.biome = biome_tag
 
     return world